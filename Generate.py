@@ -6,12 +6,36 @@ Generates a JSONL file containing:
 - instruction: a prompt for the model
 - input: tech stack and requested features
 - output: annotated directory structure with data‑flow and vulnerability hints
+
+Large datasets are generated in fixed-size shards across worker processes
+and streamed to disk, so memory stays bounded and the output for a given
+seed is the same whatever the worker count:
+
+    python Generate.py --num-samples 1000000 --workers 8 --output data.jsonl
+    python Generate.py --num-samples 1000000 --sharded --output data.jsonl
+    python Generate.py --num-samples 100000 --unique --dedup near --stats stats.json
+    python Generate.py --enumerate --num-samples 50000   # stratified subsample
+    python Generate.py --index 123456                    # one sample, O(1)
+    python Generate.py -n 1000000 --compression gzip --max-shard-mb 256
 """
 
+import argparse
+import hashlib
+import itertools
 import json
+import math
+import os
 import random
 import uuid
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+
+import dataset_writers
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # ------------------------------------------------------------------------------
 # Configuration
@@ -19,6 +43,9 @@ from typing import Dict, List, Tuple, Optional
 
 NUM_SAMPLES = 1200  # Generate at least 1000 entries
 OUTPUT_FILE = "web_arch_security_dataset.jsonl"
+SEED = 42
+SHARD_SIZE = 10000       # Samples per shard (fixes the output layout)
+SHUFFLE_BUFFER = 10000   # Entries held by the streaming shuffle
 
 # Tech stack options
 TECH_STACKS = ["Node.js", "Go", "Python/Django", "Rust"]
@@ -164,10 +191,10 @@ def generate_file_content(tech: str, file_path: str, features: Dict) -> str:
     else:
         return f"# {tech} – Core application logic."
 
-def generate_directory_tree(tech: str, selected_features: Dict) -> str:
+def build_skeleton_lines(tech: str) -> List[str]:
     """
-    Build a textual directory tree with files, optional descriptions,
-    data‑flow arrows (→), and vulnerability hints.
+    Build the static part of a tech's directory tree: files, directories
+    and file descriptions. None of it depends on the sample's features.
     """
     template = BASE_TEMPLATES[tech]
     lines = []
@@ -182,7 +209,7 @@ def generate_directory_tree(tech: str, selected_features: Dict) -> str:
             else:
                 lines.append(f"{prefix}    {child}")
                 # Add a short comment about the file's role
-                desc = generate_file_content(tech, f"{path}/{child}" if path != "." else child, selected_features)
+                desc = generate_file_content(tech, f"{path}/{child}" if path != "." else child, {})
                 lines.append(f"{prefix}        {desc}")
 
     # Start with root
@@ -194,34 +221,104 @@ def generate_directory_tree(tech: str, selected_features: Dict) -> str:
             add_dir(item, sub_children, 1)
         else:
             lines.append(f"    {item}")
-            desc = generate_file_content(tech, item, selected_features)
+            desc = generate_file_content(tech, item, {})
             lines.append(f"        {desc}")
 
-    # Add data‑flow arrows based on selected pipeline stages
-    lines.append("\n# Data Flow (→ indicates request propagation)")
-    flow_parts = []
-    if "pipeline_stages" in selected_features:
-        stages = selected_features["pipeline_stages"]
-        # Order typical pipeline stages
-        order = ["PreFilter", "RateLimit", "Fingerprint", "RiskAnalysis", "Challenge"]
-        for stage in order:
-            if stage.lower() in [s.lower() for s in stages]:
-                flow_parts.append(f"{tech.lower()}/{stage.lower()}.js")
-        if "ai_pipeline" in selected_features:
-            flow_parts.append("ai/classifier.py" if tech == "Python/Django" else "ai/classifier.go")
-        if "deception" in selected_features:
-            flow_parts.append("deception/tarpit.rs" if tech == "Rust" else "deception/tarpit.js")
-    if flow_parts:
-        lines.append("# " + " → ".join(flow_parts))
-
-    # Inject a subtle vulnerability hint
-    hint = random.choice(VULN_HINTS)
-    hint_file = random.choice([line for line in lines if line.strip().startswith("    ") and not line.strip().endswith("/")])
-    if hint_file:
-        hint_text = hint.format(file=hint_file.strip())
-        lines.append(f"\n# {hint_text}")
-
-    return "\n".join(lines)
+    return lines
+
+def compile_tree_skeletons() -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+    """
+    Per tech: the skeleton joined into one string, and the lines a
+    vulnerability hint may point at (stripped, in tree order).
+    """
+    compiled = {}
+    for tech in BASE_TEMPLATES:
+        lines = build_skeleton_lines(tech)
+        candidates = tuple(
+            line.strip() for line in lines
+            if line.startswith("    ")
+            and not line.strip().endswith("/")
+            and not line.strip().startswith("#")
+        )
+        compiled[tech] = ("\n".join(lines), candidates)
+    return compiled
+
+TREE_SKELETONS = compile_tree_skeletons()
+
+# Typical pipeline stage order for the data-flow line
+FLOW_ORDER = ["PreFilter", "RateLimit", "Fingerprint", "RiskAnalysis", "Challenge"]
+
+def build_flow_line(tech: str, selected_features: Dict) -> Optional[str]:
+    """Data-flow arrows for the selected pipeline stages, if any."""
+    if "pipeline_stages" not in selected_features:
+        return None
+
+    stages = {s.lower() for s in selected_features["pipeline_stages"]}
+    tech_lower = tech.lower()
+    flow_parts = [f"{tech_lower}/{stage.lower()}.js"
+                  for stage in FLOW_ORDER if stage.lower() in stages]
+    if "ai_pipeline" in selected_features:
+        flow_parts.append("ai/classifier.py" if tech == "Python/Django" else "ai/classifier.go")
+    if "deception" in selected_features:
+        flow_parts.append("deception/tarpit.rs" if tech == "Rust" else "deception/tarpit.js")
+    return "# " + " → ".join(flow_parts) if flow_parts else None
+
+# Lookup tables: everything after the skeleton is one of a few strings
+FLOW_HEADER = "\n# Data Flow (→ indicates request propagation)"
+STAGE_BITS = {stage.lower(): 1 << i for i, stage in enumerate(FLOW_ORDER)}
+
+def flow_key(selected_features: Dict) -> int:
+    """Row of FLOW_TABLE: stage bitmask, AI pipeline and deception flags (-1 = no stages)."""
+    if "pipeline_stages" not in selected_features:
+        return -1
+    mask = 0
+    for stage in selected_features["pipeline_stages"]:
+        mask |= STAGE_BITS.get(stage.lower(), 0)
+    return (mask << 2) | (("ai_pipeline" in selected_features) << 1) | ("deception" in selected_features)
+
+def compile_flow_table(tech: str) -> List[str]:
+    """Data-flow section (with leading newline, or "") for every flow_key."""
+    table = []
+    for key in range(1 << (len(STAGE_BITS) + 2)):
+        mask, ai, deception = key >> 2, key & 2, key & 1
+        features = {"pipeline_stages": [s for s in FLOW_ORDER if mask & STAGE_BITS[s.lower()]]}
+        if ai:
+            features["ai_pipeline"] = True
+        if deception:
+            features["deception"] = True
+        line = build_flow_line(tech, features)
+        table.append("\n" + line if line else "")
+    # flow_key -1 (no pipeline stages at all)
+    table.append("")
+    return table
+
+FLOW_TABLE = {tech: compile_flow_table(tech) for tech in BASE_TEMPLATES}
+TREE_PREFIXES = {tech: skeleton + "\n" + FLOW_HEADER
+                 for tech, (skeleton, _) in TREE_SKELETONS.items()}
+# HINT_LINES[tech][hint_idx][target_idx]
+HINT_LINES = {
+    tech: [["\n\n# " + hint.format(file=target) for target in candidates]
+           for hint in VULN_HINTS]
+    for tech, (_, candidates) in TREE_SKELETONS.items()
+}
+
+def render_tree(tech: str, selected_features: Dict, hint_idx: int, target_idx: int) -> str:
+    """
+    Assemble a directory tree from the compiled skeleton, the data-flow
+    line and the hint VULN_HINTS[hint_idx] pointing at candidate target_idx.
+    """
+    return (TREE_PREFIXES[tech] + FLOW_TABLE[tech][flow_key(selected_features)] +
+            HINT_LINES[tech][hint_idx][target_idx])
+
+def generate_directory_tree(tech: str, selected_features: Dict) -> str:
+    """
+    Build a textual directory tree with files, optional descriptions,
+    data‑flow arrows (→), and vulnerability hints.
+    """
+    # Same draws as random.choice(VULN_HINTS) / random.choice(candidates)
+    hint_idx = random.randrange(len(VULN_HINTS))
+    target_idx = random.randrange(len(TREE_SKELETONS[tech][1]))
+    return render_tree(tech, selected_features, hint_idx, target_idx)
 
 # ------------------------------------------------------------------------------
 # Feature Selection and Variation
@@ -273,36 +370,601 @@ def generate_instruction() -> str:
     return random.choice(INSTRUCTION_TEMPLATES)
 
 # ------------------------------------------------------------------------------
-# Main Generation Loop
+# Sharded, Streaming Generation
 # ------------------------------------------------------------------------------
 
-def main():
-    random.seed(42)  # For reproducibility
-    dataset = []
+def derive_seed(seed: int, *parts) -> int:
+    """
+    Stable 64-bit seed for a sub-task (e.g. a shard) of a seeded run.
+    Uses sha256 rather than hash() so it is the same in every process.
+    """
+    key = "/".join(str(part) for part in (seed,) + parts)
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+
+def generate_entry() -> Dict:
+    """Generate one sample using the module-level RNG."""
+    tech = random.choice(TECH_STACKS)
+    features = select_features()
+    instruction = generate_instruction()
+    return {
+        "instruction": instruction,
+        "input": build_input_string(tech, features),
+        "output": generate_directory_tree(tech, features),
+    }
+
+def streaming_shuffle(items: Iterable, buffer_size: int, rng: random.Random) -> Iterator:
+    """
+    Shuffle a stream holding at most `buffer_size` items: once the buffer
+    is full, each incoming item evicts a randomly chosen one.
+    """
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        index = rng.randrange(buffer_size)
+        yield buffer[index]
+        buffer[index] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+def plan_shards(num_samples: int, shard_size: int) -> List[int]:
+    """Sample count per shard (independent of the worker count)."""
+    counts = [shard_size] * (num_samples // shard_size)
+    if num_samples % shard_size:
+        counts.append(num_samples % shard_size)
+    return counts
+
+def shard_path(output: str, index: int, fmt: str = "jsonl",
+               compression: Optional[str] = None) -> str:
+    """<stem>-00000<suffix>; plain JSONL unless fmt/compression say otherwise."""
+    stem = dataset_writers.output_path(output)[:-len(".jsonl")]
+    return f"{stem}-{index:05d}{dataset_writers.output_path('', fmt, compression)}"
+
+def open_output(output: str, fmt: str = "jsonl", compression: Optional[str] = None,
+                max_shard_bytes: Optional[int] = None, seed: Optional[int] = None,
+                meta: Optional[Dict] = None):
+    """Writer for the final dataset: one file, or size-bounded shards + manifest."""
+    if max_shard_bytes:
+        return dataset_writers.ShardedWriter(output, fmt, compression, max_shard_bytes,
+                                             seed=seed, meta=meta)
+    path = dataset_writers.output_path(output, fmt, compression)
+    return dataset_writers.open_writer(path, fmt)
+
+def written_paths(writer) -> List[str]:
+    return writer.paths if isinstance(writer, dataset_writers.ShardedWriter) else [writer.path]
+
+def manifest_for(paths: List[str], counts: List[int], output: str, seed: int,
+                 fmt: str, compression: Optional[str], meta: Dict):
+    """Manifest for worker-layout shards (--sharded)."""
+    files = [dataset_writers.describe(path, count) for path, count in zip(paths, counts)]
+    dataset_writers.write_manifest(dataset_writers.manifest_path(output), files, seed,
+                                   fmt, None if fmt == "parquet" else compression, meta)
+
+def generate_shard(index: int, count: int, seed: int, path: str,
+                   shuffle_buffer: int) -> Tuple[int, str, int]:
+    """
+    Generate one shard straight to `path`. Runs in a worker process;
+    seeding the module RNG per shard keeps shards reproducible no matter
+    which worker picks them up.
+    """
+    random.seed(derive_seed(seed, "shard", index))
+    shuffle_rng = random.Random(derive_seed(seed, "shuffle", index))
+
+    entries = (generate_entry() for _ in range(count))
+    with dataset_writers.open_writer(path, dataset_writers.detect(path)["format"]) as writer:
+        for entry in streaming_shuffle(entries, shuffle_buffer, shuffle_rng):
+            writer.write(entry)
+    return index, path, count
+
+def merge_shards(paths: List[str], counts: List[int], out, rng: random.Random,
+                 deduper=None, limit: Optional[int] = None) -> int:
+    """
+    Interleave shard files into the writer `out` in a seeded random
+    order and return the number of lines written. Picking the next shard
+    with probability proportional to its remaining lines gives a uniform
+    interleaving while reading one line at a time. With a `deduper`,
+    duplicates are dropped; writing stops after `limit` lines.
+    """
+    files = [open(path, "r", encoding="utf-8") for path in paths]
+    remaining = list(counts)
+    total = sum(remaining)
+    written = 0
+    try:
+        while total and (limit is None or written < limit):
+            pick = rng.randrange(total)
+            for i, left in enumerate(remaining):
+                if pick < left:
+                    break
+                pick -= left
+            line = files[i].readline()
+            remaining[i] -= 1
+            total -= 1
+            if deduper is None or deduper.check(json.loads(line)):
+                out.write_line(line)
+                written += 1
+    finally:
+        for f in files:
+            f.close()
+    for path in paths:
+        os.remove(path)
+    return written
+
+def run_shards(jobs: List[Tuple], workers: int, func=None):
+    """Generate shard files, in worker processes when workers > 1."""
+    func = func or generate_shard
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(func, *job) for job in jobs]
+            for future in futures:
+                index, path, count = future.result()
+                print(f"  shard {index:05d}: {count} samples → {path}")
+    else:
+        for job in jobs:
+            index, path, count = func(*job)
+            print(f"  shard {index:05d}: {count} samples → {path}")
+
+def generate_dataset(num_samples: int = NUM_SAMPLES, output: str = OUTPUT_FILE,
+                     workers: int = 1, seed: int = SEED, shard_size: int = SHARD_SIZE,
+                     shuffle_buffer: int = SHUFFLE_BUFFER, sharded: bool = False,
+                     deduper=None, unique: bool = False, min_yield: float = 0.001,
+                     fmt: str = "jsonl", compression: Optional[str] = None,
+                     max_shard_bytes: Optional[int] = None,
+                     vectorized: bool = False) -> Tuple[List[str], int]:
+    """
+    Generate entries in shards and return (written paths, sample count):
+    the worker shard files with sharded=True, otherwise `output` (or its
+    size-bounded parts when max_shard_bytes is set), in fmt/compression.
+    vectorized=True renders shards with BatchRenderer (a different,
+    equally reproducible sample stream).
+
+    A `deduper` (dataset_dedup.Deduper) filters duplicates while shards are
+    merged. With unique=True further rounds of shards are generated until
+    `num_samples` distinct samples are written, or until a round yields
+    fewer than `min_yield` new samples per draw (space exhausted).
+    """
+    meta = {"mode": "batch" if vectorized else "sample", "shard_size": shard_size,
+            "shuffle_buffer": shuffle_buffer}
+
+    def shard_jobs(indexes, counts, paths):
+        if vectorized:
+            return [(i, count, seed, path) for i, count, path in zip(indexes, counts, paths)]
+        return [(i, count, seed, path, shuffle_buffer)
+                for i, count, path in zip(indexes, counts, paths)]
+
+    shard_func = generate_batch_shard if vectorized else generate_shard
+    if sharded:
+        counts = plan_shards(num_samples, shard_size)
+        paths = [shard_path(output, i, fmt, compression) for i in range(len(counts))]
+        run_shards(shard_jobs(range(len(counts)), counts, paths), workers, func=shard_func)
+        manifest_for(paths, counts, output, seed, fmt, compression, meta)
+        return paths, num_samples
+
+    written = 0
+    next_shard = 0
+    round_no = 0
+    with open_output(output, fmt, compression, max_shard_bytes, seed, meta) as out:
+        while written < num_samples:
+            need = num_samples - written
+            # Later rounds oversample: most draws will be duplicates by then
+            drawn = need if round_no == 0 else max(shard_size, 2 * need)
+            counts = plan_shards(drawn, shard_size)
+            indexes = range(next_shard, next_shard + len(counts))
+            paths = [shard_path(output, i) for i in indexes]
+            run_shards(shard_jobs(indexes, counts, paths), workers, func=shard_func)
 
-    for _ in range(NUM_SAMPLES):
-        tech = random.choice(TECH_STACKS)
-        features = select_features()
-        instruction = generate_instruction()
-        input_str = build_input_string(tech, features)
-        output_str = generate_directory_tree(tech, features)
+            merge_parts = ("merge",) if round_no == 0 else ("merge", round_no)
+            rng = random.Random(derive_seed(seed, *merge_parts))
+            added = merge_shards(paths, counts, out, rng, deduper, limit=need)
+            written += added
+            next_shard += len(counts)
+            round_no += 1
 
-        entry = {
+            if not unique:
+                break
+            if added < need and added < drawn * min_yield:
+                print(f"⚠️ Sample space exhausted after {written} distinct samples")
+                break
+
+    return written_paths(out), written
+
+# ------------------------------------------------------------------------------
+# Enumeration Mode
+# ------------------------------------------------------------------------------
+
+def ordered_selections(items: List[str], sizes: Iterable[int],
+                       optional: bool = False) -> Iterator[Optional[Tuple[str, ...]]]:
+    """
+    Every ordered pick of `sizes` items, i.e. everything random.sample can
+    return (None first when the feature is optional).
+    """
+    if optional:
+        yield None
+    for k in sizes:
+        yield from itertools.permutations(items, k)
+
+class FeatureSpace:
+    """
+    The full product tech × instruction × fingerprinting × AI pipeline ×
+    deception × stage ordering, addressed by a mixed-radix index.
+
+    Axes are small and materialized once; the product itself never is:
+    entry(i) decodes index i directly. (tech, instruction) pairs form the
+    strata used by stratified().
+    """
+
+    def __init__(self, seed: int = SEED):
+        self.seed = seed
+        self.techs = list(TECH_STACKS)
+        self.instructions = list(INSTRUCTION_TEMPLATES)
+        # Feature axes, least significant last
+        self.axes = [
+            ("fingerprinting", list(ordered_selections(FEATURES["fingerprinting"], (1, 2)))),
+            ("ai_pipeline", list(ordered_selections(FEATURES["ai_pipeline"], (1, 2), optional=True))),
+            ("deception", list(ordered_selections(FEATURES["deception"], (1, 2), optional=True))),
+            ("pipeline_stages", list(ordered_selections(FEATURES["pipeline_stages"], (2, 3, 4)))),
+        ]
+        self.strata = len(self.techs) * len(self.instructions)
+        self.stratum_size = 1
+        for _, options in self.axes:
+            self.stratum_size *= len(options)
+        self.size = self.strata * self.stratum_size
+
+        # Seeded affine bijection on [0, stratum_size) that spreads
+        # systematic picks across all feature axes
+        rng = random.Random(derive_seed(seed, "enumerate"))
+        while True:
+            self.mult = rng.randrange(1, self.stratum_size)
+            if math.gcd(self.mult, self.stratum_size) == 1:
+                break
+        self.add = rng.randrange(self.stratum_size)
+        self.offset = rng.random()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Entries in index order, lazily."""
+        for i in range(self.size):
+            yield self.entry(i)
+
+    def decode(self, index: int) -> Tuple[str, str, Dict]:
+        """(tech, instruction, features) at `index` (0 <= index < size)."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"index {index} outside space of {self.size}")
+        stratum, rest = divmod(index, self.stratum_size)
+        tech_idx, instruction_idx = divmod(stratum, len(self.instructions))
+
+        picks = []
+        for _, options in reversed(self.axes):
+            rest, pick = divmod(rest, len(options))
+            picks.append(options[pick])
+        picks.reverse()
+
+        features = {}
+        for (name, _), pick in zip(self.axes, picks):
+            if pick is not None:
+                features[name] = list(pick)
+        return self.techs[tech_idx], self.instructions[instruction_idx], features
+
+    def entry(self, index: int) -> Dict:
+        """Sample at `index`; the hint is drawn from a per-index seed."""
+        tech, instruction, features = self.decode(index)
+        rng = random.Random(derive_seed(self.seed, "hint", index))
+        hint_idx = rng.randrange(len(VULN_HINTS))
+        target_idx = rng.randrange(len(TREE_SKELETONS[tech][1]))
+        return {
             "instruction": instruction,
-            "input": input_str,
-            "output": output_str,
+            "input": build_input_string(tech, features),
+            "output": render_tree(tech, features, hint_idx, target_idx),
+        }
+
+    def stratified_index(self, k: int, n: int) -> int:
+        """
+        Index of the k-th of `n` stratified samples. Strata take turns
+        (k mod strata); within a stratum, systematic sampling at a random
+        offset, pushed through the affine bijection. O(1) per sample.
+        """
+        n = min(n, self.size)
+        if not 0 <= k < n:
+            raise IndexError(f"sample {k} outside subsample of {n}")
+        stratum, j = k % self.strata, k // self.strata
+        per_stratum = n // self.strata + (1 if stratum < n % self.strata else 0)
+        position = int((j + self.offset) * self.stratum_size / per_stratum)
+        return stratum * self.stratum_size + (self.mult * position + self.add) % self.stratum_size
+
+    def stratified(self, n: int, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Entries of the size-n stratified subsample, positions [start, stop)."""
+        n = min(n, self.size)
+        for k in range(start, n if stop is None else min(stop, n)):
+            yield self.entry(self.stratified_index(k, n))
+
+def generate_enum_shard(index: int, start: int, count: int, total: int,
+                        seed: int, path: str) -> Tuple[int, str, int]:
+    """Write subsample positions [start, start + count) to `path`."""
+    space = FeatureSpace(seed)
+    with dataset_writers.open_writer(path, dataset_writers.detect(path)["format"]) as writer:
+        for entry in space.stratified(total, start, start + count):
+            writer.write(entry)
+    return index, path, count
+
+def enumerate_dataset(num_samples: Optional[int], output: str = OUTPUT_FILE,
+                      workers: int = 1, seed: int = SEED, shard_size: int = SHARD_SIZE,
+                      sharded: bool = False, fmt: str = "jsonl",
+                      compression: Optional[str] = None,
+                      max_shard_bytes: Optional[int] = None) -> Tuple[List[str], int]:
+    """
+    Write a stratified subsample of `num_samples` entries (the whole space
+    when None or larger than it), sharded like generate_dataset.
+    """
+    total = len(FeatureSpace(seed))
+    if num_samples:
+        total = min(num_samples, total)
+
+    meta = {"mode": "enumerate", "shard_size": shard_size, "space_size": len(FeatureSpace(seed))}
+    counts = plan_shards(total, shard_size)
+    starts = [i * shard_size for i in range(len(counts))]
+    if sharded:
+        paths = [shard_path(output, i, fmt, compression) for i in range(len(counts))]
+    else:
+        paths = [shard_path(output, i) for i in range(len(counts))]
+    run_shards([(i, starts[i], count, total, seed, paths[i])
+                for i, count in enumerate(counts)], workers, func=generate_enum_shard)
+    if sharded:
+        manifest_for(paths, counts, output, seed, fmt, compression, meta)
+        return paths, total
+
+    # Strata are interleaved within every shard, so plain concatenation
+    with open_output(output, fmt, compression, max_shard_bytes, seed, meta) as out:
+        for path in paths:
+            for line in dataset_writers.iter_lines(path):
+                out.write_line(line)
+            os.remove(path)
+    return written_paths(out), total
+
+# ------------------------------------------------------------------------------
+# Batch Rendering
+# ------------------------------------------------------------------------------
+
+class BatchRenderer:
+    """
+    Renders many samples per call from arrays of option indices, with the
+    same feature distribution as select_features. Every per-sample part
+    (input fragments, flow section, hint line) is a table lookup.
+
+    Indices are drawn with NumPy when available, else with random.Random;
+    the two give different (each reproducible) streams for a seed.
+    """
+
+    def __init__(self):
+        self.techs = list(TECH_STACKS)
+        self.instructions = list(INSTRUCTION_TEMPLATES)
+        # (option tuples, [(offset, count) per pick size], probability present)
+        fingerprinting = list(ordered_selections(FEATURES["fingerprinting"], (1, 2)))
+        ai = list(ordered_selections(FEATURES["ai_pipeline"], (1, 2), optional=True))
+        deception = list(ordered_selections(FEATURES["deception"], (1, 2), optional=True))
+        stages = list(ordered_selections(FEATURES["pipeline_stages"], (2, 3, 4)))
+        self.axes = {
+            "fingerprinting": (fingerprinting, self.blocks(FEATURES["fingerprinting"], (1, 2)), 1.0),
+            "ai_pipeline": (ai, self.blocks(FEATURES["ai_pipeline"], (1, 2), 1), 0.7),
+            "deception": (deception, self.blocks(FEATURES["deception"], (1, 2), 1), 0.5),
+            "pipeline_stages": (stages, self.blocks(FEATURES["pipeline_stages"], (2, 3, 4)), 1.0),
+        }
+        labels = {"fingerprinting": "Fingerprinting", "ai_pipeline": "AI Pipeline",
+                  "deception": "Deception", "pipeline_stages": "Pipeline"}
+        self.text = {
+            name: [f", {labels[name]}: {', '.join(option)}" if option else ""
+                   for option in options]
+            for name, (options, _, _) in self.axes.items()
         }
-        dataset.append(entry)
+        self.stage_masks = [flow_key({"pipeline_stages": list(option)}) for option in stages]
+        self.target_counts = [len(TREE_SKELETONS[tech][1]) for tech in self.techs]
+
+    @staticmethod
+    def blocks(items: List[str], sizes: Iterable[int], offset: int = 0) -> List[Tuple[int, int]]:
+        """(first index, option count) of each pick size within an axis."""
+        blocks = []
+        for k in sizes:
+            count = math.perm(len(items), k)
+            blocks.append((offset, count))
+            offset += count
+        return blocks
+
+    def draw(self, n: int, seed: int) -> Dict[str, List[int]]:
+        """Option indices for n samples."""
+        if np is not None:
+            return self._draw_numpy(n, seed)
+        return self._draw_python(n, seed)
+
+    def _draw_numpy(self, n: int, seed: int) -> Dict[str, List[int]]:
+        rng = np.random.default_rng(seed)
+        drawn = {
+            "tech": rng.integers(0, len(self.techs), n),
+            "instruction": rng.integers(0, len(self.instructions), n),
+            "hint": rng.integers(0, len(VULN_HINTS), n),
+        }
+        for name, (_, blocks, present) in self.axes.items():
+            offsets = np.array([offset for offset, _ in blocks])
+            counts = np.array([count for _, count in blocks])
+            size = rng.integers(0, len(blocks), n)
+            index = offsets[size] + (rng.random(n) * counts[size]).astype(np.int64)
+            if present < 1.0:
+                index = np.where(rng.random(n) < present, index, 0)
+            drawn[name] = index
+        targets = np.array(self.target_counts)[drawn["tech"]]
+        drawn["target"] = (rng.random(n) * targets).astype(np.int64)
+        return {name: values.tolist() for name, values in drawn.items()}
+
+    def _draw_python(self, n: int, seed: int) -> Dict[str, List[int]]:
+        rng = random.Random(seed)
+        drawn = {name: [] for name in ("tech", "instruction", "hint", "target", *self.axes)}
+        for _ in range(n):
+            tech = rng.randrange(len(self.techs))
+            drawn["tech"].append(tech)
+            drawn["instruction"].append(rng.randrange(len(self.instructions)))
+            drawn["hint"].append(rng.randrange(len(VULN_HINTS)))
+            drawn["target"].append(rng.randrange(self.target_counts[tech]))
+            for name, (_, blocks, present) in self.axes.items():
+                offset, count = blocks[rng.randrange(len(blocks))]
+                index = offset + rng.randrange(count)
+                if present < 1.0 and rng.random() >= present:
+                    index = 0
+                drawn[name].append(index)
+        return drawn
+
+    def render(self, drawn: Dict[str, List[int]]) -> List[Dict]:
+        """Entries for the drawn indices."""
+        fp_text, ai_text = self.text["fingerprinting"], self.text["ai_pipeline"]
+        dec_text, stage_text = self.text["deception"], self.text["pipeline_stages"]
+        entries = []
+        for tech_i, instruction_i, hint_i, target_i, fp, ai, dec, stages in zip(
+                drawn["tech"], drawn["instruction"], drawn["hint"], drawn["target"],
+                drawn["fingerprinting"], drawn["ai_pipeline"], drawn["deception"],
+                drawn["pipeline_stages"]):
+            tech = self.techs[tech_i]
+            key = self.stage_masks[stages] | ((ai > 0) << 1) | (dec > 0)
+            entries.append({
+                "instruction": self.instructions[instruction_i],
+                "input": f"Tech: {tech}{fp_text[fp]}{ai_text[ai]}{dec_text[dec]}{stage_text[stages]}",
+                "output": TREE_PREFIXES[tech] + FLOW_TABLE[tech][key] + HINT_LINES[tech][hint_i][target_i],
+            })
+        return entries
+
+    def generate(self, n: int, seed: int) -> List[Dict]:
+        return self.render(self.draw(n, seed))
+
+def generate_batch_shard(index: int, count: int, seed: int, path: str,
+                         batch_size: int = 10000) -> Tuple[int, str, int]:
+    """Like generate_shard, but rendered in batches by BatchRenderer."""
+    renderer = BatchRenderer()
+    with dataset_writers.open_writer(path, dataset_writers.detect(path)["format"]) as writer:
+        for batch_no, start in enumerate(range(0, count, batch_size)):
+            size = min(batch_size, count - start)
+            for entry in renderer.generate(size, derive_seed(seed, "batch", index, batch_no)):
+                writer.write(entry)
+    return index, path, count
+
+# ------------------------------------------------------------------------------
+# Main
+# ------------------------------------------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the web architecture security dataset.")
+    parser.add_argument("-n", "--num-samples", type=int, default=NUM_SAMPLES,
+                        help=f"number of samples (default {NUM_SAMPLES})")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (default 1; 0 = all CPUs)")
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE,
+                        help=f"output JSONL path (default {OUTPUT_FILE})")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help=f"global random seed (default {SEED})")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help=f"samples per shard (default {SHARD_SIZE})")
+    parser.add_argument("--shuffle-buffer", type=int, default=SHUFFLE_BUFFER,
+                        help=f"streaming shuffle buffer size (default {SHUFFLE_BUFFER})")
+    parser.add_argument("--sharded", action="store_true",
+                        help="keep per-shard files instead of merging into --output")
+    parser.add_argument("--dedup", choices=["exact", "near"],
+                        help="drop exact (or also near) duplicate samples while merging")
+    parser.add_argument("--unique", action="store_true",
+                        help="keep sampling until --num-samples distinct samples are written")
+    parser.add_argument("--min-yield", type=float, default=0.001,
+                        help="--unique stops when a round yields fewer new samples per draw")
+    parser.add_argument("--stats", help="write dedup/diversity statistics JSON here")
+    parser.add_argument("--enumerate", action="store_true",
+                        help="walk the full feature space instead of sampling "
+                             "(stratified subsample when --num-samples is smaller; 0 = all)")
+    parser.add_argument("--index", type=int, action="append",
+                        help="print the enumeration sample at this index (repeatable)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="render samples in batches from precomputed tables "
+                             "(uses NumPy when installed; different sample stream)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl",
+                        help="output format (parquet needs pyarrow)")
+    parser.add_argument("--compression", choices=["none", "gzip", "zstd"], default="none",
+                        help="JSONL compression (zstd needs zstandard)")
+    parser.add_argument("--max-shard-mb", type=int,
+                        help="split the output into parts of about this many MB "
+                             "(uncompressed) plus a manifest")
+    args = parser.parse_args(argv)
+    args.compression = None if args.compression == "none" else args.compression
+    try:
+        dataset_writers.check_available(args.format, args.compression)
+    except RuntimeError as e:
+        parser.error(str(e))
+    if args.sharded and (args.dedup or args.unique):
+        parser.error("--dedup/--unique need a merged --output (drop --sharded)")
+    if args.enumerate and (args.dedup or args.unique):
+        parser.error("--enumerate samples are distinct by construction (drop --dedup/--unique)")
+    if args.index:
+        size = len(FeatureSpace(args.seed))
+        for index in args.index:
+            if not 0 <= index < size:
+                parser.error(f"--index {index} outside the feature space (0..{size - 1})")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    max_shard_bytes = args.max_shard_mb * 1024 * 1024 if args.max_shard_mb else None
+
+    if args.index:
+        space = FeatureSpace(args.seed)
+        for index in args.index:
+            print(json.dumps(space.entry(index), ensure_ascii=False))
+        return
+
+    if args.enumerate:
+        paths, written = enumerate_dataset(
+            num_samples=args.num_samples,
+            output=args.output,
+            workers=workers,
+            seed=args.seed,
+            shard_size=max(1, args.shard_size),
+            sharded=args.sharded,
+            fmt=args.format,
+            compression=args.compression,
+            max_shard_bytes=max_shard_bytes,
+        )
+        target = paths[0] if len(paths) == 1 else f"{len(paths)} shard files"
+        print(f"✅ Enumerated {written} of {len(FeatureSpace(args.seed))} samples, saved to {target}")
+        return
+
+    deduper = None
+    if args.dedup or args.unique:
+        from dataset_dedup import Deduper
+        # Initial size only: --unique rounds keep drawing candidates and
+        # the filters grow with them
+        deduper = Deduper(capacity=args.num_samples * 2, near=args.dedup == "near")
 
-    # Shuffle to avoid any ordering bias
-    random.shuffle(dataset)
+    paths, written = generate_dataset(
+        num_samples=args.num_samples,
+        output=args.output,
+        workers=workers,
+        seed=args.seed,
+        shard_size=max(1, args.shard_size),
+        shuffle_buffer=max(1, args.shuffle_buffer),
+        sharded=args.sharded,
+        deduper=deduper,
+        unique=args.unique,
+        min_yield=args.min_yield,
+        fmt=args.format,
+        compression=args.compression,
+        max_shard_bytes=max_shard_bytes,
+        vectorized=args.vectorized,
+    )
 
-    # Write to JSONL
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        for entry in dataset:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if deduper is not None:
+        stats = deduper.stats()
+        print(f"🧹 Dedup: {stats['seen']} drawn, {stats['exact_duplicates']} exact / "
+              f"{stats['near_duplicates']} near duplicates dropped, "
+              f"{stats['distinct_inputs']} distinct inputs")
+        if args.stats:
+            with open(args.stats, "w", encoding="utf-8") as f:
+                json.dump(stats, f, indent=2, ensure_ascii=False)
 
-    print(f"✅ Generated {len(dataset)} samples and saved to {OUTPUT_FILE}")
+    target = paths[0] if len(paths) == 1 else f"{len(paths)} shard files"
+    print(f"✅ Generated {written} samples and saved to {target}")
 
 if __name__ == "__main__":
     main()
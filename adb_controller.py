@@ -1,70 +1,316 @@
+import base64
+import shlex
+import shutil
 import subprocess
+import threading
 import time
 import os
+from collections import namedtuple
+
+from metrics import metrics
+from screen_frame import Frame
+from ui_locator import UILocator
+
+# stderr fragments that mean the device link is gone (as opposed to the
+# shell command itself failing)
+ADB_CONNECTION_ERRORS = (
+    "error: no devices",
+    "error: device",
+    "error: closed",
+    "error: protocol fault",
+)
+
+# `input text` is typed character by character, so keep it for short strings
+SHORT_TEXT_LIMIT = 40
+INPUT_TEXT_CHUNK = 100
+# Characters per ADBKeyBoard broadcast (base64 stays well below ARG_MAX)
+IME_CHUNK = 2000
+ADB_KEYBOARD_IME = "com.android.adbkeyboard/.AdbIME"
+# Seconds before the current IME is queried again (the user may switch it)
+IME_CHECK_TTL = 60
+KEYCODE_ENTER = 66
+KEYCODE_PASTE = 279
+
+# Filters run on the phone so only matching lines cross the wire
+SCREEN_QUERY = "dumpsys power | grep -c 'mHoldingDisplaySuspendBlocker=true'"
+NOTIFICATION_QUERY = (
+    "dumpsys notification | "
+    "grep -E 'NotificationRecord|tickerText=|title=|text=|package='"
+)
+STATE_SEPARATOR = "__NOVA_STATE__"
+
+DeviceState = namedtuple("DeviceState", ["screen_state", "notifications", "timestamp"])
 
 class ADBController:
-    def __init__(self, host="localhost:5555"):
+    def __init__(self, host="localhost:5555", max_backoff=60):
         self.host = host
-        self.connected = False
-        
-    def connect(self):
-        """Connect to ADB device"""
+        self.max_backoff = max_backoff
+        self._connected = threading.Event()
+        self._reconnect_lock = threading.Lock()
+        self._reconnect_thread = None
+        self.ui = UILocator(self)
+        self._adb_keyboard = None
+        self._adb_keyboard_checked = None
+        self._screen_state = "OFF"
+        self._screen_checked = None
+
+    @property
+    def connected(self):
+        """True while the device is reachable"""
+        return self._connected.is_set()
+
+    @connected.setter
+    def connected(self, value):
+        if value:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
+    def probe(self):
+        """Check device health without touching the ADB server"""
         try:
-            # Kill existing server
-            subprocess.run(["adb", "kill-server"], 
-                         capture_output=True, text=True)
-            
-            # Start server
-            subprocess.run(["adb", "start-server"], 
-                         capture_output=True, text=True)
-            
-            # Connect to device
             result = subprocess.run(
-                ["adb", "connect", self.host],
+                ["adb", "-s", self.host, "get-state"],
                 capture_output=True,
-                text=True
+                text=True,
+                timeout=5
             )
-            
-            if "connected" in result.stdout:
+            return result.stdout.strip() == "device"
+        except Exception:
+            return False
+
+    def connect(self, restart_server=True):
+        """Connect to ADB device
+
+        Probes the existing connection first and only restarts the ADB
+        server as a last resort, since that drops every other adb client.
+        """
+        try:
+            # Already attached
+            if self.probe():
                 self.connected = True
                 return True
-                
-            return False
-            
+
+            # Connect through the running server
+            if self._connect_host():
+                return True
+
+            if not restart_server:
+                return False
+
+            # Last resort: restart server
+            subprocess.run(["adb", "kill-server"],
+                         capture_output=True, text=True, timeout=10)
+            subprocess.run(["adb", "start-server"],
+                         capture_output=True, text=True, timeout=30)
+
+            return self._connect_host()
+
         except Exception as e:
             print(f"ADB Connection error: {e}")
+            self.connected = False
             return False
-            
+
+    def _connect_host(self):
+        """Run `adb connect` against the configured host"""
+        result = subprocess.run(
+            ["adb", "connect", self.host],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+
+        if "connected" in result.stdout and "failed" not in result.stdout:
+            self.connected = True
+            return True
+
+        self.connected = False
+        return False
+
+    def reconnect_in_background(self):
+        """Reconnect with exponential backoff on a daemon thread"""
+        with self._reconnect_lock:
+            if self._reconnect_thread and self._reconnect_thread.is_alive():
+                return
+            self._reconnect_thread = threading.Thread(
+                target=self._reconnect_loop,
+                daemon=True
+            )
+            self._reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        """Retry connect until the device is back"""
+        delay = 1
+        # Server restart is only allowed once the backoff has maxed out
+        while not self.connect(restart_server=delay >= self.max_backoff):
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def mark_disconnected(self):
+        """Flag the link as down and start reconnecting"""
+        if self.connected:
+            print("⚠️ ADB कनेक्शन टूट गया, रीकनेक्ट कर रही हूं...")
+        self.connected = False
+        # The device may come back with another keyboard
+        self._adb_keyboard_checked = None
+        self.reconnect_in_background()
+
+    def wait_until_connected(self, timeout=None):
+        """Block until connected; returns False on timeout"""
+        return self._connected.wait(timeout)
+
+    @metrics.timed("adb.execute")
     def execute(self, command):
         """Execute ADB command"""
         try:
             result = subprocess.run(
-                ["adb", "shell", command],
+                ["adb", "-s", self.host, "shell", command],
                 capture_output=True,
                 text=True,
                 timeout=10
             )
-            return result.stdout.strip()
-        except:
+        except subprocess.TimeoutExpired:
+            return ""
+        except Exception:
+            self.mark_disconnected()
+            return ""
+
+        if result.returncode != 0 and any(
+                err in result.stderr for err in ADB_CONNECTION_ERRORS):
+            self.mark_disconnected()
             return ""
+
+        return result.stdout.strip()
             
     def tap(self, x, y):
         """Tap at coordinates"""
         self.execute(f"input tap {x} {y}")
         
+    def tap_element(self, text=None, resource_id=None, content_desc=None, partial=False,
+                    refresh=False):
+        """Tap element located via the UI hierarchy; returns True if found
+
+        Pass refresh=True when the element may have moved since the last
+        dump (e.g. a chat in a list that reorders on new messages).
+        """
+        element = self.ui.find(text, resource_id, content_desc, partial, refresh)
+        if element is None:
+            return False
+
+        x, y = element.center
+        self.tap(x, y)
+        return True
+        
     def swipe(self, x1, y1, x2, y2, duration=300):
         """Swipe between coordinates"""
         self.execute(f"input swipe {x1} {y1} {x2} {y2} {duration}")
         
     def type_text(self, text):
-        """Type text"""
-        # Escape special characters
-        text = text.replace('"', '\\"')
-        text = text.replace("'", "\\'")
-        text = text.replace(" ", "%s")
-        text = text.replace("&", "\\&")
+        """Type text
+
+        Short ASCII goes through `input text`; anything longer, multi-line
+        or non-ASCII is pasted in one action via the ADBKeyBoard IME or the
+        clipboard, falling back to escaped chunks line by line.
+        """
+        if not text:
+            return
+
+        if len(text) <= SHORT_TEXT_LIMIT and text.isascii() and "\n" not in text:
+            self.input_text(text)
+        elif not self.paste_text(text):
+            self.type_lines(text)
+            
+    def type_text_stream(self, chunks):
+        """Type text produced in pieces (e.g. generated code)
+
+        Pieces are batched up to IME_CHUNK characters and typed as they
+        arrive, so the full text is never held as one string.
+        """
+        pending = []
+        size = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= IME_CHUNK:
+                self.type_text("".join(pending))
+                pending = []
+                size = 0
+        if pending:
+            self.type_text("".join(pending))
+            
+    def input_text(self, text):
+        """Type single-line text with `input text` in escaped chunks"""
+        for start in range(0, len(text), INPUT_TEXT_CHUNK):
+            chunk = text[start:start + INPUT_TEXT_CHUNK]
+            # %s is how `input text` spells a space; quote the rest for sh
+            chunk = shlex.quote(chunk.replace(" ", "%s"))
+            self.execute(f"input text {chunk}")
+            
+    def type_lines(self, text):
+        """Type multi-line text with Enter between lines (ASCII only)"""
+        ascii_text = text.encode("ascii", "ignore").decode("ascii")
+        if ascii_text != text:
+            print("⚠️ नॉन-ASCII टेक्स्ट के लिए ADBKeyBoard या Termux:API चाहिए")
+
+        lines = ascii_text.split("\n")
+        for i, line in enumerate(lines):
+            if line:
+                self.input_text(line)
+            if i < len(lines) - 1:
+                self.press_key(KEYCODE_ENTER)
+                
+    def paste_text(self, text):
+        """Insert text in one action; returns False if no bulk path exists"""
+        # ADBKeyBoard accepts base64 so any script survives the shell
+        if self.adb_keyboard_active():
+            for start in range(0, len(text), IME_CHUNK):
+                chunk = text[start:start + IME_CHUNK]
+                encoded = base64.b64encode(chunk.encode("utf-8")).decode("ascii")
+                self.execute(f"am broadcast -a ADB_INPUT_B64 --es msg {encoded}")
+            return True
+
+        # Same phone: set clipboard through Termux:API, then paste
+        if self.set_clipboard(text):
+            self.press_key(KEYCODE_PASTE)
+            return True
+
+        return False
+        
+    def adb_keyboard_active(self):
+        """Check whether ADBKeyBoard is the current IME (cached IME_CHECK_TTL s)"""
+        now = time.monotonic()
+        if (self._adb_keyboard_checked is not None and
+                now - self._adb_keyboard_checked < IME_CHECK_TTL):
+            return self._adb_keyboard
+
+        ime = self.execute("settings get secure default_input_method")
+        if not ime:
+            # Timeout or lost link: don't remember a non-answer
+            return False
+        self._adb_keyboard = ime == ADB_KEYBOARD_IME
+        self._adb_keyboard_checked = now
+        return self._adb_keyboard
         
-        self.execute(f'input text "{text}"')
+    def set_clipboard(self, text):
+        """Set device clipboard (only when ADB targets this phone)"""
+        if not self.host.startswith(("localhost", "127.0.0.1")):
+            return False
+        if not shutil.which("termux-clipboard-set"):
+            return False
+
+        try:
+            result = subprocess.run(
+                ["termux-clipboard-set"],
+                input=text,
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
         
     def press_key(self, keycode):
         """Press key"""
@@ -87,22 +333,61 @@ class ADBController:
         """Open app by package name"""
         self.execute(f"monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
         
+    def exec_out(self, command, timeout=10):
+        """Run command via `adb exec-out` and return raw stdout bytes"""
+        try:
+            result = subprocess.run(
+                ["adb", "-s", self.host, "exec-out", command],
+                capture_output=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return b""
+        except Exception:
+            self.mark_disconnected()
+            return b""
+
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", "replace")
+            if any(err in stderr for err in ADB_CONNECTION_ERRORS):
+                self.mark_disconnected()
+            return b""
+
+        return result.stdout
+
+    def capture_frame(self, raw=True, scale=1, save_path=None):
+        """Capture screen straight into memory
+
+        Streams `screencap` over exec-out, so nothing touches /sdcard or
+        the local disk unless save_path is given. Raw RGBA skips PNG
+        encoding on the phone; scale keeps every n-th pixel.
+        """
+        if raw:
+            frame = Frame.from_raw(self.exec_out("screencap"))
+        else:
+            frame = Frame.from_png(self.exec_out("screencap -p"))
+
+        if frame is None:
+            return None
+
+        if scale > 1:
+            frame = frame.downscale(scale)
+
+        if save_path:
+            frame.save(save_path)
+
+        return frame
+
     def take_screenshot(self, save_path):
         """Take screenshot"""
-        # Save to device
-        temp_path = "/sdcard/screenshot.png"
-        self.execute(f"screencap -p {temp_path}")
-        
-        # Pull to computer
-        subprocess.run(["adb", "pull", temp_path, save_path], 
-                      capture_output=True, text=True)
-        
-        # Cleanup
-        self.execute(f"rm {temp_path}")
+        return self.capture_frame(raw=False, save_path=save_path)
         
     def get_notifications(self):
         """Get notifications"""
-        output = self.execute("dumpsys notification")
+        return self.parse_notifications(self.execute(NOTIFICATION_QUERY))
+        
+    def parse_notifications(self, output):
+        """Parse (filtered) dumpsys notification output"""
         notifications = []
         
         # Parse notification output
@@ -129,6 +414,31 @@ class ADBController:
             
         return notifications
         
+    def get_device_state(self, screen_ttl=10):
+        """Screen state and notifications in a single shell round trip
+
+        Screen state changes far less often than notifications, so it is
+        only re-queried once the cached value is older than screen_ttl.
+        """
+        now = time.monotonic()
+        refresh_screen = not self._screen_fresh(screen_ttl, now)
+
+        command = NOTIFICATION_QUERY
+        if refresh_screen:
+            command = f"{SCREEN_QUERY}; echo {STATE_SEPARATOR}; {NOTIFICATION_QUERY}"
+
+        output = self.execute(command)
+
+        if refresh_screen:
+            count, _, output = output.partition(STATE_SEPARATOR)
+            self._update_screen_state(count, now)
+
+        return DeviceState(
+            self._screen_state,
+            self.parse_notifications(output),
+            time.time()
+        )
+        
     def unlock_screen(self, pin=None):
         """Unlock screen"""
         # Wake up
@@ -149,10 +459,19 @@ class ADBController:
         """Lock screen"""
         self.press_power()
         
-    def get_screen_state(self):
-        """Get screen state"""
-        output = self.execute("dumpsys power")
-        if "mHoldingDisplaySuspendBlocker=true" in output:
-            return "ON"
-        else:
-            return "OFF"
+    def get_screen_state(self, max_age=0):
+        """Get screen state (served from cache if younger than max_age)"""
+        now = time.monotonic()
+        if not self._screen_fresh(max_age, now):
+            self._update_screen_state(self.execute(SCREEN_QUERY), now)
+        return self._screen_state
+        
+    def _screen_fresh(self, max_age, now):
+        return (self._screen_checked is not None and
+                now - self._screen_checked < max_age)
+        
+    def _update_screen_state(self, count, now):
+        """Store result of SCREEN_QUERY (a match count)"""
+        count = count.strip()
+        self._screen_state = "ON" if count.isdigit() and int(count) > 0 else "OFF"
+        self._screen_checked = now
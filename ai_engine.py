@@ -1,14 +1,26 @@
 import json
-import requests
 import re
 from datetime import datetime
 
+from code_templates import TEMPLATE_DIR, TemplateRegistry
+from context_builder import ContextBuilder
+from metrics import metrics
+
+SAMBANOVA_API_URL = "https://api.sambanova.ai/v1/complete"
+
 class AIEngine:
     def __init__(self, config, memory):
         self.config = config
         self.memory = memory
         self.backend = config['ai_backend']
         self.responses = self.load_responses()
+        self.context_builder = ContextBuilder(
+            memory, token_budget=config.get('context_token_budget', 1024)
+        )
+        # Templates are read from disk on the first code request
+        self.code_templates = TemplateRegistry(
+            config.get('code_templates_dir') or TEMPLATE_DIR
+        )
         
     def load_responses(self):
         """Load response patterns"""
@@ -30,6 +42,7 @@ class AIEngine:
             ]
         }
     
+    @metrics.timed("ai.process")
     def process(self, command, context, personality):
         """Process command through AI"""
         # Try multiple backends
@@ -37,7 +50,7 @@ class AIEngine:
         
         # 1. Try Sambanova
         if self.backend == "sambanova" or response is None:
-            response = self.try_sambanova(command)
+            response = self.try_sambanova(command, context, personality)
             
         # 2. Try HuggingChat
         if self.backend == "huggingchat" or response is None:
@@ -55,14 +68,20 @@ class AIEngine:
         
         return response
         
-    def try_sambanova(self, command):
+    def try_sambanova(self, command, context=None, personality=None):
         """Try Sambanova API"""
         # Placeholder - add your Sambanova API key
         api_key = self.config.get('sambanova_api_key', '')
         if not api_key:
             return None
             
+        # Budgeted prompt instead of the raw (nested) memory context
+        prompt = self.context_builder.build(command, context, personality)
+            
         try:
+            # Imported on first use; keeps it off the startup path
+            import requests
+            
             # API call structure
             headers = {
                 "Authorization": f"Bearer {api_key}",
@@ -70,18 +89,19 @@ class AIEngine:
             }
             
             data = {
-                "prompt": command,
+                "prompt": prompt,
                 "max_tokens": 150
             }
             
-            # response = requests.post(
-            #     "https://api.sambanova.ai/v1/complete",
-            #     headers=headers,
-            #     json=data
-            # )
-            # 
-            # if response.status_code == 200:
-            #     return response.json()['text']
+            response = requests.post(
+                self.config.get('sambanova_api_url', SAMBANOVA_API_URL),
+                headers=headers,
+                json=data,
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                return response.json()['text']
             
             return None
             
@@ -159,57 +179,22 @@ class AIEngine:
         
     def generate_code(self, topic):
         """Generate code for given topic"""
-        # Simple code templates
-        templates = {
-            'python': '''# Python code for {topic}
-def main():
-    print("Hello, World!")
-    
-if __name__ == "__main__":
-    main()''',
-            
-            'website': '''<!-- HTML for {topic} -->
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{topic}</title>
-</head>
-<body>
-    <h1>Welcome to {topic}</h1>
-</body>
-</html>''',
-            
-            'android': '''// Android code for {topic}
-public class MainActivity extends AppCompatActivity {{
-    @Override
-    protected void onCreate(Bundle savedInstanceState) {{
-        super.onCreate(savedInstanceState);
-        setContentView(R.layout.activity_main);
-    }}
-}}'''
-        }
+        return self.code_templates.render(topic)
         
-        # Detect language
-        if 'python' in topic.lower():
-            lang = 'python'
-        elif 'html' in topic.lower() or 'website' in topic.lower():
-            lang = 'website'
-        elif 'android' in topic.lower() or 'app' in topic.lower():
-            lang = 'android'
-        else:
-            lang = 'python'
-            
-        return templates[lang].format(topic=topic)
+    def generate_code_stream(self, topic):
+        """Code for a topic as chunks, headed by a 'Code for' comment"""
+        return self.code_templates.stream(topic)
         
     def learn(self, command, response):
         """Learn from interactions"""
-        if 'learnings' not in self.memory.data:
-            self.memory.data['learnings'] = {}
-            
-        key = command[:50]  # First 50 chars as key
-        self.memory.data['learnings'][key] = {
-            'command': command,
-            'response': response,
-            'timestamp': datetime.now().isoformat(),
-            'count': self.memory.data['learnings'].get(key, {}).get('count', 0) + 1
-        }
+        with self.memory.lock:
+            if 'learnings' not in self.memory.data:
+                self.memory.data['learnings'] = {}
+                
+            key = command[:50]  # First 50 chars as key
+            self.memory.data['learnings'][key] = {
+                'command': command,
+                'response': response,
+                'timestamp': datetime.now().isoformat(),
+                'count': self.memory.data['learnings'].get(key, {}).get('count', 0) + 1
+            }
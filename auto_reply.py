@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+
+class TokenBucket:
+    """Token bucket rate limiter (rate in tokens per second)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now=None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def available(self, now=None):
+        return self.refill(now) >= 1
+
+    def consume(self, now=None):
+        if not self.available(now):
+            return False
+        self.tokens -= 1
+        return True
+
+    @property
+    def full(self):
+        return self.tokens >= self.capacity
+
+class ReplyBatch:
+    """Messages from one sender waiting for a single reply"""
+
+    __slots__ = ("notification", "messages", "first_seen", "last_seen")
+
+    def __init__(self, notification, seen):
+        self.notification = notification
+        self.messages = []
+        self.first_seen = seen
+        self.last_seen = seen
+
+    def add(self, notification, seen):
+        text = notification.get('text', '')
+        if text and text not in self.messages:
+            self.messages.append(text)
+        self.last_seen = seen
+
+    def merged(self):
+        """Notification carrying every batched message"""
+        merged = dict(self.notification)
+        merged['text'] = "\n".join(self.messages)
+        merged['messages'] = list(self.messages)
+        # Monotonic time the first message was seen, for reply latency
+        merged['seen'] = self.first_seen
+        return merged
+
+class AutoReplyScheduler:
+    """Queue-backed auto-reply worker
+
+    Notifications from the same (package, sender) are merged until the
+    conversation goes quiet for `window` seconds (or `window * 3` passes),
+    then sent as one reply subject to a per-contact and a global token
+    bucket. Rate-limited batches stay pending and keep absorbing messages.
+    """
+
+    def __init__(self, send, key_func, window=3.0, contact_interval=60,
+                 global_per_minute=10, global_burst=3):
+        self.send = send
+        self.key_func = key_func
+        self.window = window
+        self.max_wait = window * 3
+        self.contact_interval = contact_interval
+        self.queue = queue.Queue()
+        self.pending = {}
+        self.contact_buckets = {}
+        self.global_bucket = TokenBucket(global_per_minute / 60.0, global_burst)
+        self.thread = None
+        self.is_running = False
+
+    def start(self):
+        """Start worker thread (idempotent)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+
+    def submit(self, notification):
+        """Queue a notification for auto-reply; never blocks"""
+        # 'seen' is set when the notification was first picked up (triage)
+        self.queue.put((notification.get('seen', time.monotonic()), notification))
+
+    def run(self):
+        """Worker loop"""
+        while self.is_running:
+            try:
+                timeout = 0.5 if self.pending else 1.0
+                seen, notification = self.queue.get(timeout=timeout)
+                self.merge(notification, seen)
+
+                # Drain whatever else arrived in the same burst
+                while True:
+                    seen, notification = self.queue.get_nowait()
+                    self.merge(notification, seen)
+
+            except queue.Empty:
+                pass
+
+            try:
+                self.flush_due()
+            except Exception as e:
+                print(f"Auto-reply error: {e}")
+
+    def merge(self, notification, seen):
+        key = self.key_func(notification)
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = ReplyBatch(notification, seen)
+        batch.add(notification, seen)
+
+    def allow(self, key, now):
+        """Check both buckets and consume a token from each only if both allow"""
+        bucket = self.contact_buckets.get(key)
+        if bucket is None:
+            bucket = self.contact_buckets[key] = TokenBucket(1.0 / self.contact_interval, 1)
+
+        if not (bucket.available(now) and self.global_bucket.available(now)):
+            return False
+
+        bucket.consume(now)
+        self.global_bucket.consume(now)
+        return True
+
+    def flush_due(self):
+        """Send every batch whose window closed and whose limits allow it"""
+        now = time.monotonic()
+
+        for key, batch in list(self.pending.items()):
+            quiet = now - batch.last_seen >= self.window
+            overdue = now - batch.first_seen >= self.max_wait
+            if not (quiet or overdue):
+                continue
+            if not self.allow(key, now):
+                continue
+
+            del self.pending[key]
+            try:
+                self.send(batch.merged())
+            except Exception as e:
+                print(f"Auto-reply error: {e}")
+
+        # Idle contacts with a full bucket carry no state worth keeping
+        for key in [k for k, b in self.contact_buckets.items()
+                    if k not in self.pending and b.refill(now) >= b.capacity]:
+            del self.contact_buckets[key]
@@ -0,0 +1,225 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# A chunk ends after a record whose checksum hits this mask (~32 records
+# on average), so boundaries move with content, not position: trimming
+# old conversations off the front leaves later chunks untouched.
+BOUNDARY_MASK = 0x1f
+MAX_CHUNK_RECORDS = 256
+
+class BackupStore:
+    """Rolling, content-deduplicated memory snapshots
+
+    Every top-level memory section is split into content-defined chunks
+    stored once under chunks/<sha256>. A snapshot is a small manifest of
+    chunk hashes, so sections that did not change cost nothing.
+
+    Snapshot, restore and prune hold one lock, so garbage collection can
+    never remove chunks of a snapshot whose manifest is still being written.
+    """
+
+    def __init__(self, backup_dir, keep=10, compression=None):
+        self.backup_dir = Path(backup_dir)
+        self.chunk_dir = self.backup_dir / "chunks"
+        self.keep = keep
+        self.compression = compression or ("zstd" if zstandard else "gzip")
+        self.lock = threading.RLock()
+
+    # --------------------------------------------------------------------------
+    # Chunk storage
+    # --------------------------------------------------------------------------
+
+    def _compress(self, payload):
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=9).compress(payload), ".zst"
+        return gzip.compress(payload, compresslevel=6, mtime=0), ".gz"
+
+    @staticmethod
+    def _decompress(path):
+        raw = path.read_bytes()
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("zstandard needed to restore this backup")
+            return zstandard.ZstdDecompressor().decompress(raw)
+        return gzip.decompress(raw)
+
+    def _chunk_path(self, digest):
+        folder = self.chunk_dir / digest[:2]
+        for suffix in (".zst", ".gz"):
+            path = folder / f"{digest}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def _put_chunk(self, payload, stats):
+        digest = hashlib.sha256(payload).hexdigest()
+        if self._chunk_path(digest):
+            stats["reused_chunks"] += 1
+            return digest
+
+        data, suffix = self._compress(payload)
+        folder = self.chunk_dir / digest[:2]
+        folder.mkdir(parents=True, exist_ok=True)
+        temp = folder / f"{digest}{suffix}.tmp"
+        temp.write_bytes(data)
+        temp.replace(folder / f"{digest}{suffix}")
+
+        stats["new_chunks"] += 1
+        stats["bytes_written"] += len(data)
+        return digest
+
+    # --------------------------------------------------------------------------
+    # Sections
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(value):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True,
+                          separators=(",", ":"))
+
+    def _split(self, records):
+        """Group encoded records into content-defined chunks"""
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if ((zlib.crc32(record.encode("utf-8")) & BOUNDARY_MASK) == 0 or
+                    len(chunk) >= MAX_CHUNK_RECORDS):
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _store_section(self, value, stats):
+        if isinstance(value, list):
+            kind = "list"
+            records = [self._encode(item) for item in value]
+        elif isinstance(value, dict):
+            kind = "dict"
+            records = [self._encode([key, value[key]]) for key in sorted(value)]
+        else:
+            kind = "value"
+            records = [self._encode(value)]
+
+        chunks = [
+            self._put_chunk(("[" + ",".join(chunk) + "]").encode("utf-8"), stats)
+            for chunk in self._split(records)
+        ]
+        return {"type": kind, "chunks": chunks}
+
+    def _load_section(self, section):
+        items = []
+        for digest in section["chunks"]:
+            path = self._chunk_path(digest)
+            if path is None:
+                raise FileNotFoundError(f"missing backup chunk {digest}")
+            items.extend(json.loads(self._decompress(path)))
+
+        if section["type"] == "dict":
+            return {key: value for key, value in items}
+        if section["type"] == "value":
+            return items[0] if items else None
+        return items
+
+    # --------------------------------------------------------------------------
+    # Snapshots
+    # --------------------------------------------------------------------------
+
+    def snapshot(self, data):
+        """Store a snapshot of data; returns the manifest
+
+        `data` must not change during the call; pass a copy.
+        """
+        with self.lock:
+            return self._snapshot(data)
+
+    def _snapshot(self, data):
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        stats = {"new_chunks": 0, "reused_chunks": 0, "bytes_written": 0}
+
+        snapshot_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        manifest = {
+            "id": snapshot_id,
+            "created": datetime.now().isoformat(),
+            "sections": {key: self._store_section(value, stats)
+                         for key, value in data.items()},
+            "stats": stats,
+        }
+
+        path = self.backup_dir / f"snapshot-{snapshot_id}.json"
+        temp = path.with_suffix(".tmp")
+        temp.write_text(json.dumps(manifest), encoding="utf-8")
+        temp.replace(path)
+
+        self._prune()
+        return manifest
+
+    def list_snapshots(self):
+        """Manifests, newest first"""
+        snapshots = []
+        for path in sorted(self.backup_dir.glob("snapshot-*.json"), reverse=True):
+            try:
+                snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def find(self, snapshot_id=None):
+        """Manifest for an id or unique id prefix (latest by default)"""
+        snapshots = self.list_snapshots()
+        if snapshot_id is None:
+            if not snapshots:
+                raise KeyError("no backup snapshots")
+            return snapshots[0]
+
+        matches = [manifest for manifest in snapshots
+                   if manifest["id"].startswith(snapshot_id)]
+        exact = [manifest for manifest in matches if manifest["id"] == snapshot_id]
+        if exact:
+            return exact[0]
+        if not matches:
+            raise KeyError(f"no backup snapshot {snapshot_id}")
+        if len(matches) > 1:
+            raise KeyError(f"backup id {snapshot_id} matches {len(matches)} snapshots")
+        return matches[0]
+
+    def restore(self, snapshot_id=None):
+        """Rebuild memory data from a snapshot (latest by default)"""
+        with self.lock:
+            manifest = self.find(snapshot_id)
+            return {key: self._load_section(section)
+                    for key, section in manifest["sections"].items()}
+
+    def prune(self):
+        """Keep the newest `keep` snapshots and drop unreferenced chunks"""
+        with self.lock:
+            self._prune()
+
+    def _prune(self):
+        paths = sorted(self.backup_dir.glob("snapshot-*.json"), reverse=True)
+        for path in paths[self.keep:]:
+            path.unlink()
+
+        referenced = set()
+        for manifest in self.list_snapshots():
+            for section in manifest["sections"].values():
+                referenced.update(section["chunks"])
+
+        if not self.chunk_dir.exists():
+            return
+        for path in self.chunk_dir.glob("*/*"):
+            # .tmp files are chunks being written right now
+            if path.suffix == ".tmp":
+                continue
+            if path.name.split(".")[0] not in referenced:
+                os.unlink(path)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Dataset generation throughput benchmark
+
+Compares samples per second of Generate.generate_entry against the
+original per-sample tree builder (kept below), after checking both
+produce identical entries for the same seed, and of BatchRenderer.
+
+    python bench/bench_generate.py --num-samples 1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Generate
+
+def legacy_directory_tree(tech, selected_features):
+    """Original generate_directory_tree (with the hint filter fixed)"""
+    template = Generate.BASE_TEMPLATES[tech]
+    lines = []
+
+    def add_dir(path, children, indent=0):
+        prefix = "    " * indent
+        lines.append(f"{prefix}{path}/")
+        for child in sorted(children):
+            if child.endswith("/"):
+                sub_children = template.get(child.rstrip("/"), [])
+                add_dir(child, sub_children, indent + 1)
+            else:
+                lines.append(f"{prefix}    {child}")
+                desc = Generate.generate_file_content(
+                    tech, f"{path}/{child}" if path != "." else child, selected_features)
+                lines.append(f"{prefix}        {desc}")
+
+    lines.append(".")
+    for item in sorted(template["root"]):
+        if item.endswith("/"):
+            add_dir(item, template.get(item.rstrip("/"), []), 1)
+        else:
+            lines.append(f"    {item}")
+            lines.append(f"        {Generate.generate_file_content(tech, item, selected_features)}")
+
+    lines.append("\n# Data Flow (→ indicates request propagation)")
+    flow_parts = []
+    if "pipeline_stages" in selected_features:
+        stages = selected_features["pipeline_stages"]
+        order = ["PreFilter", "RateLimit", "Fingerprint", "RiskAnalysis", "Challenge"]
+        for stage in order:
+            if stage.lower() in [s.lower() for s in stages]:
+                flow_parts.append(f"{tech.lower()}/{stage.lower()}.js")
+        if "ai_pipeline" in selected_features:
+            flow_parts.append("ai/classifier.py" if tech == "Python/Django" else "ai/classifier.go")
+        if "deception" in selected_features:
+            flow_parts.append("deception/tarpit.rs" if tech == "Rust" else "deception/tarpit.js")
+    if flow_parts:
+        lines.append("# " + " → ".join(flow_parts))
+
+    hint = random.choice(Generate.VULN_HINTS)
+    hint_file = random.choice([
+        line for line in lines
+        if line.startswith("    ") and not line.strip().endswith("/")
+        and not line.strip().startswith("#")
+    ])
+    lines.append(f"\n# {hint.format(file=hint_file.strip())}")
+    return "\n".join(lines)
+
+def legacy_entry():
+    tech = random.choice(Generate.TECH_STACKS)
+    features = Generate.select_features()
+    instruction = Generate.generate_instruction()
+    return {
+        "instruction": instruction,
+        "input": Generate.build_input_string(tech, features),
+        "output": legacy_directory_tree(tech, features),
+    }
+
+def run(make_entry, num_samples, seed):
+    random.seed(seed)
+    start = time.perf_counter()
+    for _ in range(num_samples):
+        make_entry()
+    return num_samples / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-samples", type=int, default=1000000)
+    parser.add_argument("--verify", type=int, default=10000,
+                        help="samples compared for identical output")
+    parser.add_argument("--seed", type=int, default=Generate.SEED)
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="BatchRenderer samples per call")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    legacy = [legacy_entry() for _ in range(args.verify)]
+    random.seed(args.seed)
+    current = [Generate.generate_entry() for _ in range(args.verify)]
+    if legacy != current:
+        print("❌ Compiled templates changed the generated output")
+        return 1
+    print(f"✅ Identical output for {args.verify} samples")
+
+    results = {"num_samples": args.num_samples}
+    for name, make_entry in (("legacy", legacy_entry), ("compiled", Generate.generate_entry)):
+        rate = run(make_entry, args.num_samples, args.seed)
+        results[f"{name}_samples_per_second"] = round(rate, 1)
+        print(f"{name:<10} {rate:>12,.0f} samples/s")
+
+    renderer = Generate.BatchRenderer()
+    start = time.perf_counter()
+    for offset in range(0, args.num_samples, args.batch_size):
+        renderer.generate(min(args.batch_size, args.num_samples - offset), args.seed + offset)
+    rate = args.num_samples / (time.perf_counter() - start)
+    results["batch_samples_per_second"] = round(rate, 1)
+    results["batch_numpy"] = Generate.np is not None
+    print(f"{'batch':<10} {rate:>12,.0f} samples/s (numpy: {Generate.np is not None})")
+    results["speedup"] = round(results["compiled_samples_per_second"] /
+                               results["legacy_samples_per_second"], 2)
+    print(f"speedup    {results['speedup']}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Screenshot capture benchmark
+
+Compares the old sdcard round trip (screencap to /sdcard, adb pull, rm)
+with the exec-out capture paths. Reports frames per second and bytes
+written to flash storage (device + local) per frame.
+
+    python bench/bench_screenshot.py --frames 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from adb_controller import ADBController
+
+def legacy_capture(adb, save_path):
+    """Original take_screenshot implementation"""
+    temp_path = "/sdcard/screenshot.png"
+    adb.execute(f"screencap -p {temp_path}")
+    subprocess.run(["adb", "pull", temp_path, save_path],
+                   capture_output=True, text=True)
+    adb.execute(f"rm {temp_path}")
+    size = os.path.getsize(save_path) if os.path.exists(save_path) else 0
+    # Written once on the device and once locally
+    return size * 2
+
+def run(name, capture, frames):
+    written = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        written += capture()
+    elapsed = time.perf_counter() - start
+    return {
+        "method": name,
+        "frames": frames,
+        "seconds": round(elapsed, 4),
+        "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        "bytes_written_per_frame": written // frames,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=2,
+                        help="downscale factor for the scaled raw run")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    adb = ADBController()
+    if not adb.connect(restart_server=False):
+        print("⚠️ No ADB device available")
+        return 1
+
+    tmp = tempfile.mkdtemp(prefix="nova-bench-")
+    save_path = os.path.join(tmp, "screen.png")
+
+    def png():
+        adb.capture_frame(raw=False)
+        return 0
+
+    def raw():
+        adb.capture_frame()
+        return 0
+
+    def raw_scaled():
+        adb.capture_frame(scale=args.scale)
+        return 0
+
+    def raw_saved():
+        frame = adb.capture_frame()
+        return frame.save(save_path) if frame else 0
+
+    results = [
+        run("sdcard_roundtrip", lambda: legacy_capture(adb, save_path), args.frames),
+        run("exec_out_png", png, args.frames),
+        run("exec_out_raw", raw, args.frames),
+        run(f"exec_out_raw_scale{args.scale}", raw_scaled, args.frames),
+        run("exec_out_raw_save", raw_saved, args.frames),
+    ]
+
+    for row in results:
+        print(f"{row['method']:<24} {row['fps']:>8.2f} fps "
+              f"{row['bytes_written_per_frame']:>10} B written/frame")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Memory serialization benchmark
+
+Builds a large synthetic memory (conversations, learnings, notifications)
+and measures save time, load time and file size for every available
+memory format.
+
+    python bench/bench_serialization.py --conversations 500 --learnings 100000
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serializers
+from memory_manager import MemoryManager
+
+def build_memory(conversations, learnings, notifications):
+    memory = MemoryManager.create_default_memory(None)
+    for i in range(conversations):
+        memory["conversations"].append({
+            "timestamp": f"2026-01-01T10:{i % 60:02d}:{i % 60:02d}.000000",
+            "user": f"नोवा, कल सुबह {i % 12} बजे का रिमाइंडर लगा दो",
+            "nova": f"ठीक है, कल सुबह {i % 12} बजे रिमाइंडर लगा दिया ✅",
+            "context": {"time": f"10:{i % 60:02d}", "date": "2026-01-01"},
+        })
+    for i in range(learnings):
+        memory["learnings"].setdefault(f"pattern {i // 4}", []).append({
+            "response": f"जवाब नंबर {i}",
+            "timestamp": "2026-01-01T10:00:00.000000",
+            "used_count": i % 9,
+        })
+    for i in range(notifications):
+        memory["notifications"].append({
+            "package": "com.whatsapp",
+            "title": f"Contact {i % 40}",
+            "text": f"message {i}",
+            "timestamp": "2026-01-01T10:00:00.000000",
+        })
+    return memory
+
+def measure(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--learnings", type=int, default=100000)
+    parser.add_argument("--notifications", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    data = build_memory(args.conversations, args.learnings, args.notifications)
+    workdir = Path(tempfile.mkdtemp(prefix="nova-serial-"))
+    results = []
+    try:
+        for name in serializers.SERIALIZERS:
+            if name == "msgpack" and serializers.msgpack is None:
+                print(f"{name:<10} skipped (msgpack not installed)")
+                continue
+
+            memory = MemoryManager(workdir / "memory.json", serializer=name)
+            memory.data = data
+            save_ms = measure(memory.save, args.repeat)
+            load_ms = measure(lambda: MemoryManager(memory.memory_file, serializer=name),
+                              args.repeat)
+
+            assert MemoryManager(memory.memory_file, serializer=name).data == data
+            size = memory.memory_file.stat().st_size
+            results.append({"format": name, "save_ms": save_ms,
+                            "load_ms": load_ms, "file_bytes": size})
+            print(f"{name:<10} save {save_ms:>9.1f} ms  load {load_ms:>9.1f} ms  "
+                  f"{size / 1024:>10.1f} KB")
+            memory.memory_file.unlink()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Text input throughput benchmark
+
+Measures characters per second for each ADBController text path on a
+short ASCII string, a generated code file and a Devanagari message.
+
+    python bench/bench_type_text.py --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from adb_controller import ADBController
+
+SAMPLES = {
+    "short_ascii": "Meeting at 5 pm, see you there",
+    # A generated-file sized snippet
+    "code": (Path(__file__).resolve().parent.parent / "screen_frame.py").read_text()[:3000],
+    "devanagari": "नमस्ते! मैं नोवा हूं, आपकी पर्सनल सेक्रेटरी। " * 10,
+}
+
+def legacy_type_text(adb, text):
+    """Original single-command implementation"""
+    text = text.replace('"', '\\"')
+    text = text.replace("'", "\\'")
+    text = text.replace(" ", "%s")
+    text = text.replace("&", "\\&")
+    adb.execute(f'input text "{text}"')
+
+def measure(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    elapsed = time.perf_counter() - start
+    return round(len(text) * repeat / elapsed, 1) if elapsed else 0.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    adb = ADBController()
+    if not adb.connect(restart_server=False):
+        print("⚠️ No ADB device available")
+        return 1
+
+    def ime(text):
+        adb._adb_keyboard = True
+        try:
+            adb.paste_text(text)
+        finally:
+            adb._adb_keyboard = None
+
+    def clipboard(text):
+        if adb.set_clipboard(text):
+            adb.press_key(279)
+
+    paths = {
+        "legacy_input_text": lambda text: legacy_type_text(adb, text),
+        "chunked_input_text": adb.type_lines,
+        "ime_broadcast": ime,
+        "clipboard_paste": clipboard,
+        "type_text": adb.type_text,
+    }
+
+    if not adb.set_clipboard("nova"):
+        print("⚠️ termux-clipboard-set unavailable, skipping clipboard path")
+        del paths["clipboard_paste"]
+
+    results = []
+    for sample, text in SAMPLES.items():
+        for path, fn in paths.items():
+            cps = measure(fn, text, args.repeat)
+            results.append({"sample": sample, "chars": len(text),
+                            "path": path, "chars_per_second": cps})
+            print(f"{sample:<12} {len(text):>6} chars  {path:<20} {cps:>10.1f} chars/s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
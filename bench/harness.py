@@ -0,0 +1,59 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+FAKES_DIR = BENCH_DIR / "fakes"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
+
+def use_fakes(latency=0.005, **env):
+    """Put the fake adb/termux executables first on PATH"""
+    os.environ["PATH"] = f"{FAKES_DIR}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["NOVA_FAKE_LATENCY"] = str(latency)
+    os.environ.setdefault("NOVA_FAKE_FIXTURES", str(FIXTURES_DIR))
+    for key, value in env.items():
+        os.environ[f"NOVA_FAKE_{key.upper()}"] = str(value)
+
+def percentiles(samples):
+    """Summary of a list of millisecond timings"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the assistant's console chatter while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
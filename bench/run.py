@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Nova benchmark suite
+
+Runs the assistant's hot paths against fake adb/termux executables
+(bench/fakes) and a local HTTP stub for the AI backends, then writes
+the results as JSON so two versions can be compared.
+
+    python bench/run.py                         # all scenarios
+    python bench/run.py -s notification_burst   # one scenario
+    python bench/run.py --compare bench/results/old.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from harness import (BENCH_DIR, FIXTURES_DIR, git_revision, percentiles,
+                     quiet, use_fakes)
+
+SCENARIOS = {}
+
+def scenario(func):
+    SCENARIOS[func.__name__] = func
+    return func
+
+def timed_ms(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+# ------------------------------------------------------------------------------
+# Scenarios
+# ------------------------------------------------------------------------------
+
+@scenario
+def command_roundtrip(args, workdir):
+    """Text command -> AIEngine.process (stub backend) -> memory save"""
+    from ai_engine import AIEngine
+    from memory_manager import MemoryManager
+    from stub_backend import StubBackend
+
+    personality = {"style": "friendly_feminine", "language": "hinglish"}
+    commands = ["नमस्ते नोवा", "अभी क्या समय है", "आज क्या तारीख है",
+                "note doodh lana hai", "open whatsapp"]
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        config = {
+            "ai_backend": "sambanova",
+            "sambanova_api_key": "bench",
+            "sambanova_api_url": stub.url,
+        }
+        memory = MemoryManager(workdir / "roundtrip.json")
+        ai = AIEngine(config, memory)
+
+        samples = []
+        with quiet():
+            for i in range(args.iterations):
+                command = commands[i % len(commands)]
+                start = time.perf_counter()
+                response = ai.process(command, memory.get_context(), personality)
+                memory.add_conversation(command, response)
+                samples.append((time.perf_counter() - start) * 1000)
+
+        return {
+            "iterations": args.iterations,
+            "latency_ms": percentiles(samples),
+            "first_ms": round(samples[0], 3),
+            "last_ms": round(samples[-1], 3),
+            "backend_requests": stub.requests,
+            "backend_prompt_chars": stub.prompt_chars,
+            "memory_file_bytes": memory.memory_file.stat().st_size,
+        }
+
+@scenario
+def notification_burst(args, workdir):
+    """One poll that sees a burst of messages from a single sender"""
+    from notification_monitor import NotificationMonitor
+    from adb_controller import ADBController
+    from memory_manager import MemoryManager
+
+    # Burst fixture: N messages from one WhatsApp contact plus the usual noise
+    base = (FIXTURES_DIR / "dumpsys_notification.txt").read_text(encoding="utf-8")
+    burst = []
+    for i in range(args.burst):
+        burst += [
+            f"    NotificationRecord(0x9{i:04x}: pkg=com.whatsapp user=UserHandle{{0}} id={900 + i})",
+            "      package=com.whatsapp",
+            "      extras={",
+            "        android.title=Ravi",
+            f"        android.text=message {i}",
+            "      }",
+        ]
+    fixture = workdir / "burst_notifications.txt"
+    fixture.write_text(base + "\n".join(burst) + "\n", encoding="utf-8")
+    use_fakes(args.latency, notifications=fixture)
+
+    adb = ADBController()
+    adb.connect(restart_server=False)
+    memory = MemoryManager(workdir / "burst.json")
+    config = {"auto_reply_window": 0.2, "auto_reply_contact_interval": 60,
+              "auto_reply_global_per_minute": 600}
+    monitor = NotificationMonitor(adb, ai=None, memory=memory, config=config)
+
+    sent = []
+    send_reply = monitor.send_reply
+
+    def record_send(package, sender, reply):
+        sent.append((time.perf_counter(), sender))
+        return send_reply(package, sender, reply)
+
+    monitor.send_reply = record_send
+    monitor.replies.start()
+
+    with quiet():
+        start = time.perf_counter()
+        state = adb.get_device_state()
+        fetch_ms = (time.perf_counter() - start) * 1000
+        new = monitor.get_new_notifications(state.notifications)
+        per_notification = []
+        for notification in new:
+            ms, _ = timed_ms(monitor.process_notification, notification, state.screen_state)
+            per_notification.append(ms)
+        poll_ms = (time.perf_counter() - start) * 1000
+
+        # Let the reply worker drain
+        deadline = time.perf_counter() + 30
+        while time.perf_counter() < deadline and (monitor.replies.pending or not monitor.replies.queue.empty()):
+            time.sleep(0.05)
+        monitor.replies.stop()
+        monitor.replies.thread.join(timeout=30)
+
+    use_fakes(args.latency)
+    return {
+        "notifications": len(new),
+        "fetch_ms": round(fetch_ms, 3),
+        "poll_ms": round(poll_ms, 3),
+        "process_ms": percentiles(per_notification),
+        "replies_sent": len(sent),
+        "first_reply_after_ms": round((sent[0][0] - start) * 1000, 3) if sent else None,
+    }
+
+@scenario
+def memory_growth(args, workdir):
+    """Grow memory to N learned entries, timing save/load at checkpoints"""
+    from memory_manager import MemoryManager
+
+    memory = MemoryManager(workdir / "growth.json")
+    checkpoints = sorted({c for c in (1000, 10000, args.entries) if c <= args.entries})
+    results = []
+    added = 0
+    insert_start = time.perf_counter()
+
+    for checkpoint in checkpoints:
+        while added < checkpoint:
+            memory.add_learning(f"pattern {added}", f"जवाब नंबर {added}")
+            added += 1
+        insert_ms = (time.perf_counter() - insert_start) * 1000
+
+        save_ms, _ = timed_ms(memory.save)
+        load_ms, loaded = timed_ms(MemoryManager, memory.memory_file)
+        results.append({
+            "entries": checkpoint,
+            "insert_ms_total": round(insert_ms, 3),
+            "save_ms": round(save_ms, 3),
+            "load_ms": round(load_ms, 3),
+            "file_bytes": memory.memory_file.stat().st_size,
+        })
+        del loaded
+
+    return {
+        "checkpoints": results,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+@scenario
+def evolution_pass(args, workdir):
+    """EvolutionEngine.evolve over a populated memory"""
+    from evolution_engine import EvolutionEngine
+    from memory_manager import MemoryManager
+
+    memory = MemoryManager(workdir / "evolution.json")
+    prompts = ["क्या हाल है", "open whatsapp now", "time kya hua", "note kal meeting hai"]
+    for i in range(args.conversations):
+        prompt = prompts[i % len(prompts)]
+        memory.data["conversations"].append({
+            "timestamp": f"2026-01-01T00:{i % 60:02d}:00",
+            "user": f"{prompt} {i % 7}",
+            "nova": f"ठीक है {i % 5}",
+            "context": {"time": "10:00", "date": "2026-01-01"},
+        })
+
+    engine = EvolutionEngine(memory, {"learning_rate": 0.1})
+    samples = []
+    with quiet():
+        for _ in range(args.repeat):
+            ms, _ = timed_ms(engine.evolve)
+            samples.append(ms)
+
+    return {
+        "conversations": args.conversations,
+        "evolve_ms": percentiles(samples),
+        "patterns_learned": len(memory.data.get("learned_patterns", {})),
+    }
+
+@scenario
+def cold_start(args, workdir):
+    """main.py --startup-report under -X importtime"""
+    from startup import measure_startup
+    return measure_startup(top=5)
+
+# ------------------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------------------
+
+def flatten(data, prefix=""):
+    """Numeric leaves as {"a.b.c": value}"""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            flat.update(flatten(value, f"{prefix}{i}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip(".")] = data
+    return flat
+
+def compare(baseline, current):
+    """Print per-metric change against a previous results file"""
+    old = flatten(baseline.get("scenarios", {}))
+    new = flatten(current.get("scenarios", {}))
+    print(f"\nCompared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    for key in sorted(new):
+        if key in old and old[key]:
+            change = (new[key] - old[key]) / abs(old[key]) * 100
+            print(f"  {key:<56} {old[key]:>12} -> {new[key]:>12} ({change:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="seconds added to every fake adb/termux call")
+    parser.add_argument("--backend-latency", type=float, default=0.05,
+                        help="seconds the stub AI backend waits per request")
+    parser.add_argument("--iterations", type=int, default=12,
+                        help="command_roundtrip iterations")
+    parser.add_argument("--burst", type=int, default=20,
+                        help="messages in notification_burst")
+    parser.add_argument("--entries", type=int, default=100000,
+                        help="memory_growth target size")
+    parser.add_argument("--conversations", type=int, default=1000,
+                        help="evolution_pass memory size")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="evolution_pass repetitions")
+    parser.add_argument("--output", help="results JSON (default bench/results/<time>.json)")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    use_fakes(args.latency)
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+
+    workdir = Path(tempfile.mkdtemp(prefix="nova-bench-"))
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            print(f"▶ {name} ...", flush=True)
+            try:
+                start = time.perf_counter()
+                outcome = SCENARIOS[name](args, workdir)
+                outcome["wall_s"] = round(time.perf_counter() - start, 3)
+            except ImportError as e:
+                outcome = {"skipped": f"missing dependency: {e.name}"}
+            results["scenarios"][name] = outcome
+            print(json.dumps(outcome, indent=2, ensure_ascii=False))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n✅ Results saved to {output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), results)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
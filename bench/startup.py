@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Cold start report
+
+Runs `main.py --startup-report` under `python -X importtime` with the
+fake adb/termux executables and a throwaway HOME, then combines the
+assistant's phase timings with the slowest imports.
+
+    python bench/startup.py --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from harness import REPO_DIR, use_fakes
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` lines into (module, self_us, cumulative_us)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, module = parts
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_startup(top=10, memory_file=None):
+    """Run one cold start and return the combined report"""
+    home = Path(tempfile.mkdtemp(prefix="nova-home-"))
+    (home / ".nova").mkdir()
+    if memory_file:
+        (home / ".nova" / "abheraj.json").write_bytes(Path(memory_file).read_bytes())
+
+    env = dict(os.environ, HOME=str(home))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(REPO_DIR / "main.py"), "--startup-report"],
+        capture_output=True, text=True, env=env, cwd=str(home), timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    report = json.loads((home / ".nova" / "startup.json").read_text())
+    imports = parse_importtime(result.stderr)
+    local = {p.stem for p in REPO_DIR.glob("*.py")}
+
+    report["import_total_us"] = sum(self_us for _, self_us, _ in imports)
+    report["slowest_imports"] = [
+        {"module": module, "self_us": self_us, "cumulative_us": cumulative_us,
+         "local": module in local}
+        for module, self_us, cumulative_us in
+        sorted(imports, key=lambda row: row[2], reverse=True)[:top]
+    ]
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--memory", help="memory JSON to start with")
+    parser.add_argument("--output", help="write report JSON here")
+    args = parser.parse_args(argv)
+
+    use_fakes()
+    report = measure_startup(args.top, args.memory)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the AI backends
+
+Accepts POSTs on any path and answers {"text": ...} after a configurable
+delay, so AIEngine's HTTP path can be timed without network access.
+
+    python bench/stub_backend.py --port 8765 --latency 0.2
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            payload = {}
+
+        self.server.requests += 1
+        self.server.prompt_chars += len(str(payload.get("prompt", "")))
+        time.sleep(self.server.latency)
+
+        body = json.dumps({
+            "text": f"जी, मैंने सुना: {str(payload.get('prompt', ''))[:40]}"
+        }, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubBackend:
+    """Stub server running on a daemon thread"""
+
+    def __init__(self, port=0, latency=0.05):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+        self.server.latency = latency
+        self.server.requests = 0
+        self.server.prompt_chars = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1/complete"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    @property
+    def prompt_chars(self):
+        return self.server.prompt_chars
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    with StubBackend(args.port, args.latency) as stub:
+        print(f"Stub backend on {stub.url} (latency {args.latency}s)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
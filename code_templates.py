@@ -0,0 +1,168 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+from metrics import metrics
+
+TEMPLATE_DIR = Path(__file__).parent / "templates" / "code"
+TOPIC_PLACEHOLDER = "{{topic}}"
+STREAM_LINES = 40  # Lines per streamed chunk
+WORD_RE = re.compile(r"[\w+#]+")
+
+# Words that say what kind of thing is wanted but not the stack; they
+# only decide the match when nothing more specific is in the topic
+GENERIC_KEYWORDS = {
+    "app", "server", "web", "api", "backend", "frontend", "ui", "page",
+    "site", "script", "cli", "database", "db", "table", "query", "component",
+}
+GENERIC_WEIGHT = 0.25
+
+CodeTemplate = namedtuple(
+    "CodeTemplate", ["name", "language", "keywords", "comment", "priority", "parts"]
+)
+
+# Used when templates/code is missing (e.g. only *.py were copied)
+FALLBACK_TEMPLATE = """# name: python
+# language: Python
+# keywords: python py script
+# comment: #
+# priority: 0
+---
+# Python code for {{topic}}
+def main():
+    print("Hello, World!")
+
+if __name__ == "__main__":
+    main()
+"""
+
+def parse_template(text, default_name="template"):
+    """Parse a template file: `# key: value` header lines, `---`, body
+
+    The body is split on {{topic}} once here, so rendering is a join.
+    """
+    header, separator, body = text.partition("\n---\n")
+    if not separator:
+        header, body = "", text
+
+    fields = {}
+    for line in header.splitlines():
+        key, _, value = line.lstrip("# ").partition(":")
+        fields[key.strip()] = value.strip()
+
+    return CodeTemplate(
+        name=fields.get("name", default_name),
+        language=fields.get("language", default_name),
+        keywords=tuple(fields.get("keywords", default_name).lower().split()),
+        comment=fields.get("comment", "#"),
+        priority=int(fields.get("priority", 100)),
+        parts=tuple(body.rstrip("\n").split(TOPIC_PLACEHOLDER)),
+    )
+
+def normalize_topic(topic):
+    """Cache key for a topic: lowercase words, order and spacing ignored"""
+    return " ".join(sorted(set(WORD_RE.findall(topic.lower()))))
+
+class TemplateRegistry:
+    """Code templates loaded once from disk, matched through a keyword index
+
+    Each keyword maps to the templates declaring it; a topic picks the
+    template with the highest keyword score, generic words counting for
+    GENERIC_WEIGHT (ties go to the lower priority).
+    Matches are cached by normalized topic.
+    """
+
+    def __init__(self, directory=TEMPLATE_DIR, default="python", cache_size=256):
+        self.directory = Path(directory)
+        self.default = default
+        self.cache_size = cache_size
+        self.templates = {}
+        self.index = {}
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self._loaded = False
+
+    def load(self):
+        """Read every *.tmpl file (first call only)"""
+        if self._loaded:
+            return
+        with self.lock:
+            if self._loaded:
+                return
+            templates = {}
+            if self.directory.is_dir():
+                for path in sorted(self.directory.glob("*.tmpl")):
+                    template = parse_template(path.read_text(encoding="utf-8"), path.stem)
+                    templates[template.name] = template
+            if not templates:
+                fallback = parse_template(FALLBACK_TEMPLATE)
+                templates[fallback.name] = fallback
+
+            index = {}
+            for template in templates.values():
+                for keyword in template.keywords:
+                    index.setdefault(keyword, []).append(template.name)
+            self.templates = templates
+            self.index = index
+            if self.default not in templates:
+                self.default = min(templates.values(), key=lambda t: t.priority).name
+            self._loaded = True
+
+    def match(self, topic):
+        """Template for a topic"""
+        self.load()
+        key = normalize_topic(topic)
+        with self.lock:
+            name = self.cache.get(key)
+            if name is not None:
+                self.cache.move_to_end(key)
+                metrics.incr("code.cache_hit")
+                return self.templates[name]
+
+        metrics.incr("code.cache_miss")
+        scores = {}
+        for word in key.split():
+            weight = GENERIC_WEIGHT if word in GENERIC_KEYWORDS else 1
+            for name in self.index.get(word, ()):
+                scores[name] = scores.get(name, 0) + weight
+        if scores:
+            name = min(scores, key=lambda n: (-scores[n], self.templates[n].priority))
+        else:
+            name = self.default
+
+        with self.lock:
+            self.cache[key] = name
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return self.templates[name]
+
+    def render(self, topic):
+        """Full snippet for a topic"""
+        return topic.join(self.match(topic).parts)
+
+    def stream(self, topic, header=True, lines=STREAM_LINES):
+        """Snippet for a topic in chunks of `lines` lines
+
+        Lets callers type long snippets as they are produced instead of
+        building the whole string first.
+        """
+        template = self.match(topic)
+        if header:
+            opener, _, closer = template.comment.partition(" ")
+            yield f"{opener} Code for: {topic}{' ' + closer if closer else ''}\n\n"
+
+        buffer = ""
+        for i, part in enumerate(template.parts):
+            buffer += (topic if i else "") + part
+            pieces = buffer.split("\n")
+            while len(pieces) > lines:
+                yield "\n".join(pieces[:lines]) + "\n"
+                pieces = pieces[lines:]
+            buffer = "\n".join(pieces)
+        if buffer:
+            yield buffer
+
+    def names(self):
+        self.load()
+        return sorted(self.templates)
@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+class ContactState:
+    """What we know about one ongoing chat"""
+
+    __slots__ = ("thread_id", "last_message", "last_message_at",
+                 "last_reply", "last_reply_at", "replies")
+
+    def __init__(self, thread_id=None, last_message="", last_message_at=0.0,
+                 last_reply="", last_reply_at=0.0, replies=0):
+        self.thread_id = thread_id or uuid.uuid4().hex[:8]
+        self.last_message = last_message
+        self.last_message_at = last_message_at
+        self.last_reply = last_reply
+        self.last_reply_at = last_reply_at
+        self.replies = replies
+
+    @property
+    def last_active(self):
+        return max(self.last_message_at, self.last_reply_at)
+
+    def export(self):
+        return [self.thread_id, self.last_message, self.last_message_at,
+                self.last_reply, self.last_reply_at, self.replies]
+
+class ContactStates:
+    """Per-contact chat state with a TTL
+
+    Keyed by (package, sender) and ordered by last activity, so expiring
+    idle contacts only looks at the oldest entries. A contact silent for
+    longer than `thread_gap` starts a new thread id. Wall-clock times are
+    used so the table survives restarts (persisted as a memory section).
+    """
+
+    def __init__(self, ttl=86400, thread_gap=3600, max_contacts=1000):
+        self.ttl = ttl
+        self.thread_gap = thread_gap
+        self.max_contacts = max_contacts
+        self.contacts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _touch(self, key, now):
+        """State for key, starting a new thread after a long silence"""
+        self._expire(now)
+        state = self.contacts.get(key)
+        if state is None or now - state.last_active > self.thread_gap:
+            state = self.contacts[key] = ContactState()
+        self.contacts.move_to_end(key)
+        while len(self.contacts) > self.max_contacts:
+            self.contacts.popitem(last=False)
+        return state
+
+    def _expire(self, now):
+        while self.contacts:
+            key, state = next(iter(self.contacts.items()))
+            if now - state.last_active <= self.ttl:
+                break
+            del self.contacts[key]
+
+    def message(self, key, text, now=None):
+        """Record an incoming message; returns the contact's state"""
+        now = now or time.time()
+        with self.lock:
+            state = self._touch(key, now)
+            state.last_message = text
+            state.last_message_at = now
+            return state
+
+    def reply(self, key, text, now=None):
+        """Record a sent reply"""
+        now = now or time.time()
+        with self.lock:
+            state = self._touch(key, now)
+            state.last_reply = text
+            state.last_reply_at = now
+            state.replies += 1
+            return state
+
+    def get(self, key, now=None):
+        """Live state for key, or None"""
+        now = now or time.time()
+        with self.lock:
+            state = self.contacts.get(key)
+            if state is None or now - state.last_active > self.ttl:
+                return None
+            return state
+
+    def replied_within(self, key, seconds, now=None):
+        """True if we replied to this contact in the last `seconds`"""
+        now = now or time.time()
+        state = self.get(key, now)
+        return state is not None and state.replies > 0 and now - state.last_reply_at <= seconds
+
+    def __len__(self):
+        return len(self.contacts)
+
+    # --------------------------------------------------------------------------
+    # Persistence (memory section)
+    # --------------------------------------------------------------------------
+
+    def export(self):
+        """{package: {sender: [thread, message, at, reply, at, replies]}}"""
+        with self.lock:
+            self._expire(time.time())
+            exported = {}
+            for (package, sender), state in self.contacts.items():
+                exported.setdefault(package, {})[sender] = state.export()
+            return exported
+
+    def clear(self):
+        with self.lock:
+            self.contacts.clear()
+
+    def load(self, data):
+        entries = []
+        for package, senders in (data or {}).items():
+            for sender, fields in senders.items():
+                try:
+                    entries.append(((package, sender), ContactState(*fields)))
+                except TypeError:
+                    continue
+        entries.sort(key=lambda entry: entry[1].last_active)
+        with self.lock:
+            # Oldest first, so existing keys move to their new place too
+            for key, state in entries:
+                self.contacts[key] = state
+                self.contacts.move_to_end(key)
+            while len(self.contacts) > self.max_contacts:
+                self.contacts.popitem(last=False)
+            self._expire(time.time())
@@ -0,0 +1,207 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+
+from metrics import metrics
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+WORD_RE = re.compile(r"\w+")
+
+def count_tokens(text):
+    """Approximate token count
+
+    Words and punctuation count as one token each and long words as one
+    per 8 characters, which tracks BPE tokenizers closely enough for
+    budgeting without loading one.
+    """
+    return sum(1 + len(token) // 8 for token in TOKEN_RE.findall(text))
+
+def truncate(text, max_tokens):
+    """Cut `text` to about `max_tokens` tokens on a word boundary"""
+    used = 0
+    for match in TOKEN_RE.finditer(text):
+        used += 1 + len(match.group()) // 8
+        if used > max_tokens:
+            return text[:match.start()].rstrip() + "…"
+    return text
+
+def terms(text):
+    return set(WORD_RE.findall(text.lower()))
+
+class ConversationIndex:
+    """Inverted index over memory conversations
+
+    Conversations are keyed by position; the index is extended as new
+    turns are appended and rebuilt when the list is trimmed or replaced.
+    Callers pass a copy of the list, so the indexed turns are compared
+    by identity rather than the list itself.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.first = None
+        self.last = None
+        self.size = 0
+
+    def sync(self, conversations):
+        first = conversations[0] if conversations else None
+        if first is not self.first or len(conversations) < self.size or \
+                (self.size and conversations[self.size - 1] is not self.last):
+            self.postings = {}
+            self.first = first
+            self.size = 0
+        for position in range(self.size, len(conversations)):
+            conversation = conversations[position]
+            for term in terms(f"{conversation.get('user', '')} {conversation.get('nova', '')}"):
+                self.postings.setdefault(term, []).append(position)
+        self.size = len(conversations)
+        self.last = conversations[-1] if conversations else None
+
+    def search(self, query, limit=5, exclude=()):
+        """Positions of the best matches for `query` (idf-weighted overlap)"""
+        scores = {}
+        for term in terms(query):
+            positions = self.postings.get(term)
+            if not positions:
+                continue
+            idf = math.log(1 + self.size / len(positions))
+            for position in positions:
+                scores[position] = scores.get(position, 0.0) + idf
+        for position in exclude:
+            scores.pop(position, None)
+        # Ties go to the more recent turn
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return [position for position, _ in ranked[:limit]]
+
+class ContextBuilder:
+    """Assemble a prompt from memory within a token budget
+
+    The prompt holds a short header (persona, time, date), older turns
+    relevant to the command as one-line summaries, the most recent turns
+    verbatim, and the command. When over budget, summaries are dropped
+    (least relevant first), then the oldest recent turns. Built prompts
+    are kept in an LRU cache keyed by the command and the memory state.
+    """
+
+    def __init__(self, memory, token_budget=1024, recent_turns=4, relevant_turns=3,
+                 summary_tokens=24, cache_size=64):
+        self.memory = memory
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.relevant_turns = relevant_turns
+        self.summary_tokens = summary_tokens
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.index = ConversationIndex()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def header(self, context, personality):
+        personality = personality or {}
+        context = context or {}
+        return (f"You are Nova, a {personality.get('tone', 'caring')} personal assistant "
+                f"({personality.get('style', 'friendly')}, language: "
+                f"{personality.get('language', 'hinglish')}). "
+                f"Time: {context.get('time', '')}, date: {context.get('date', '')}.")
+
+    @staticmethod
+    def turn(conversation):
+        return f"User: {conversation.get('user', '')}\nNova: {conversation.get('nova', '')}"
+
+    def summary(self, conversation):
+        user = truncate(conversation.get('user', ''), self.summary_tokens // 2)
+        nova = truncate(conversation.get('nova', ''), self.summary_tokens // 2)
+        return f"- {conversation.get('timestamp', '')[:16]} user: {user} / nova: {nova}"
+
+    def build(self, command, context=None, personality=None):
+        """Prompt text for `command`"""
+        # Copy under the memory lock so the cache key and the index see
+        # the same list while add_conversation appends and trims
+        with self.memory.lock:
+            conversations = list(self.memory.data.get("conversations", []))
+        last = conversations[-1].get("timestamp") if conversations else None
+        context = context or {}
+        key = (command, len(conversations), last, context.get('time'), context.get('date'),
+               repr(sorted((personality or {}).items())), self.token_budget)
+
+        with self.lock:
+            prompt = self.cache.get(key)
+            if prompt is not None:
+                self.hits += 1
+                metrics.incr("context.cache_hit")
+                self.cache.move_to_end(key)
+                return prompt
+
+            self.misses += 1
+            metrics.incr("context.cache_miss")
+            with metrics.timer("context.build"):
+                prompt = self._build(command, conversations, context, personality)
+            self.cache[key] = prompt
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return prompt
+
+    def _build(self, command, conversations, context, personality):
+        self.index.sync(conversations)
+
+        recent_start = max(0, len(conversations) - self.recent_turns)
+        recent = list(range(recent_start, len(conversations)))
+        relevant = [p for p in self.index.search(command, self.relevant_turns * 2,
+                                                 exclude=recent)
+                    if p < recent_start]
+
+        # Same exchange repeated (e.g. "time" asked every hour): keep the newest
+        seen = set()
+        for position in reversed(recent):
+            seen.add(self.dedup_key(conversations[position]))
+        summaries = []
+        for position in relevant:
+            key = self.dedup_key(conversations[position])
+            if key not in seen and len(summaries) < self.relevant_turns:
+                seen.add(key)
+                summaries.append(position)
+        recent = self.dedup_recent(conversations, recent)
+
+        head = self.header(context, personality)
+        # A huge command could never fit; it gets at most half the budget
+        tail = f"User: {truncate(command, self.token_budget // 2)}\nNova:"
+        budget = self.token_budget - count_tokens(head) - count_tokens(tail)
+
+        summary_lines = [(p, self.summary(conversations[p])) for p in summaries]
+        recent_lines = [self.turn(conversations[p]) for p in recent]
+        used = sum(count_tokens(line) for _, line in summary_lines) + \
+            sum(count_tokens(line) for line in recent_lines)
+
+        # Least relevant summaries go first, then the oldest recent turns
+        while used > budget and summary_lines:
+            used -= count_tokens(summary_lines.pop()[1])
+        while used > budget and recent_lines:
+            used -= count_tokens(recent_lines.pop(0))
+
+        parts = [head]
+        if summary_lines:
+            # Chronological order reads better than score order
+            parts.append("Earlier:\n" + "\n".join(line for _, line in sorted(summary_lines)))
+        parts.extend(recent_lines)
+        parts.append(tail)
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def dedup_key(conversation):
+        return (" ".join(conversation.get('user', '').lower().split()),
+                " ".join(conversation.get('nova', '').lower().split()))
+
+    def dedup_recent(self, conversations, positions):
+        kept, seen = [], set()
+        for position in reversed(positions):
+            key = self.dedup_key(conversations[position])
+            if key not in seen:
+                seen.add(key)
+                kept.append(position)
+        return kept[::-1]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self.cache),
+                "indexed": self.index.size}
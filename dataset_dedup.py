@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Streaming deduplication and diversity statistics for generated datasets
+
+- Exact duplicates: blake2b digest of each record's canonical JSON,
+  tracked in a bloom filter (tunable false-positive rate; grows when
+  more items arrive than it was sized for).
+- Near duplicates: MinHash over word shingles of the parts that vary
+  between samples (instruction, input, data-flow and hint lines), with
+  LSH banding; each band's buckets are again a bloom filter.
+
+Used by Generate.py (--dedup / --unique) or standalone on a JSONL file:
+
+    python dataset_dedup.py data.jsonl --output unique.jsonl --near
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MASK64 = (1 << 64) - 1
+FLOW_HEADER = "# Data Flow"
+
+# ------------------------------------------------------------------------------
+# Bloom Filter
+# ------------------------------------------------------------------------------
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter sized for `capacity` items at `error_rate`.
+    Items are byte digests; the k bit positions come from double hashing
+    two 64-bit halves of the digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes) -> List[int]:
+        if len(digest) < 16:
+            digest = hashlib.blake2b(digest, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest: bytes) -> bool:
+        """Insert; returns True if the item was (probably) not seen before."""
+        new = False
+        bits = self.bits
+        for p in self._positions(digest):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that keeps its false-positive rate past `capacity`:
+    once the current filter holds as many items as it was sized for, a
+    filter twice as large with half the error rate is added, so the
+    combined rate stays around `error_rate` however many items arrive.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(self.capacity, error_rate / 2)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        return any(digest in bloom for bloom in self.filters)
+
+    def add(self, digest: bytes) -> bool:
+        """Insert; returns True if the item was (probably) not seen before."""
+        if digest in self:
+            return False
+        current = self.filters[-1]
+        if current.count >= self.capacity << (len(self.filters) - 1):
+            current = BloomFilter(self.capacity << len(self.filters),
+                                  self.error_rate / 2 ** (len(self.filters) + 1))
+            self.filters.append(current)
+        return current.add(digest)
+
+    @property
+    def count(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bloom.nbytes for bloom in self.filters)
+
+# ------------------------------------------------------------------------------
+# MinHash / LSH
+# ------------------------------------------------------------------------------
+
+class MinHasher:
+    """
+    MinHash signatures using multiply-shift hashing of 32-bit shingle
+    hashes: perm_i(x) = ((a_i * x + b_i) mod 2^64) >> 32.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        params = hashlib.blake2b(f"minhash/{seed}".encode(), digest_size=64).digest()
+        self.a = []
+        self.b = []
+        counter = 0
+        while len(self.a) < num_perm:
+            block = hashlib.blake2b(params + counter.to_bytes(4, "little"), digest_size=64).digest()
+            for i in range(0, 64, 16):
+                if len(self.a) < num_perm:
+                    self.a.append(int.from_bytes(block[i:i + 8], "little") | 1)
+                    self.b.append(int.from_bytes(block[i + 8:i + 16], "little"))
+            counter += 1
+        self.num_perm = num_perm
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    @staticmethod
+    def shingles(text: str, size: int = 2) -> List[int]:
+        words = text.lower().split()
+        if len(words) < size:
+            words = words + [""] * (size - len(words))
+        return list({
+            int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"),
+                                           digest_size=4).digest(), "little")
+            for i in range(len(words) - size + 1)
+        })
+
+    def signature(self, text: str) -> List[int]:
+        values = self.shingles(text)
+        if np is not None:
+            x = np.array(values, dtype=np.uint64)[None, :]
+            # uint64 arithmetic wraps, which is the mod 2^64 we want
+            return ((self._a * x + self._b) >> np.uint64(32)).min(axis=1).tolist()
+        return [min(((a * x + b) & MASK64) >> 32 for x in values)
+                for a, b in zip(self.a, self.b)]
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures. A record is a near-duplicate
+    candidate when any band matches a band seen before; with b bands of
+    r rows the similarity threshold is roughly (1/b) ** (1/r).
+    """
+
+    def __init__(self, capacity: int, num_perm: int = 64, bands: int = 4,
+                 error_rate: float = 0.001):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.filters = [ScalableBloomFilter(capacity, error_rate) for _ in range(bands)]
+
+    @property
+    def threshold(self) -> float:
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def band_digests(self, signature: List[int]) -> List[bytes]:
+        rows = self.rows
+        return [
+            hashlib.blake2b(
+                b"".join(v.to_bytes(4, "little") for v in signature[i * rows:(i + 1) * rows]),
+                digest_size=16, person=i.to_bytes(2, "little")
+            ).digest()
+            for i in range(self.bands)
+        ]
+
+    def add(self, signature: List[int]) -> bool:
+        """Insert; returns True if some band collided (near duplicate)."""
+        collided = False
+        for bloom, digest in zip(self.filters, self.band_digests(signature)):
+            if not bloom.add(digest):
+                collided = True
+        return collided
+
+    @property
+    def nbytes(self) -> int:
+        return sum(f.nbytes for f in self.filters)
+
+# ------------------------------------------------------------------------------
+# Dedup + Diversity
+# ------------------------------------------------------------------------------
+
+def canonical(entry: Dict) -> bytes:
+    return json.dumps(entry, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":")).encode("utf-8")
+
+def dynamic_text(entry: Dict) -> str:
+    """The parts of a record that vary between samples of the same stack."""
+    output = entry.get("output", "")
+    if FLOW_HEADER in output:
+        # Skip the skeleton and the constant header line
+        tail = output.split(FLOW_HEADER, 1)[1].split("\n", 1)[-1]
+    else:
+        tail = output
+    return " ".join((entry.get("instruction", ""), entry.get("input", ""), tail))
+
+def hint_of(entry: Dict) -> str:
+    """Hint category (text before the colon on the last line)."""
+    last = entry.get("output", "").rsplit("\n", 1)[-1]
+    return last.split(":", 1)[0].lstrip("# ")
+
+def entropy(counter: Counter) -> float:
+    total = sum(counter.values())
+    if not total:
+        return 0.0
+    return -sum(n / total * math.log2(n / total) for n in counter.values() if n)
+
+class Deduper:
+    """
+    Streaming exact (+ optional near) duplicate filter with diversity
+    statistics. Filters are sized for `capacity` records and grow past it
+    (see ScalableBloomFilter), so the error rate holds however many
+    candidates are checked.
+    """
+
+    def __init__(self, capacity: int, near: bool = False, error_rate: float = 0.001,
+                 num_perm: int = 64, bands: int = 4):
+        self.exact = ScalableBloomFilter(capacity, error_rate)
+        self.inputs = ScalableBloomFilter(capacity, error_rate)
+        self.minhash = MinHasher(num_perm) if near else None
+        self.lsh = LSHIndex(capacity, num_perm, bands, error_rate) if near else None
+        self.seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.kept = 0
+        self.techs = Counter()
+        self.instructions = Counter()
+        self.hints = Counter()
+
+    def check(self, entry: Dict) -> bool:
+        """True if the entry should be kept (and records it as seen)."""
+        self.seen += 1
+        digest = hashlib.blake2b(canonical(entry), digest_size=16).digest()
+        if digest in self.exact:
+            self.exact_duplicates += 1
+            return False
+
+        if self.lsh is not None and self.lsh.add(self.minhash.signature(dynamic_text(entry))):
+            self.exact.add(digest)
+            self.near_duplicates += 1
+            return False
+
+        self.exact.add(digest)
+        self.kept += 1
+        self.inputs.add(hashlib.blake2b(entry.get("input", "").encode("utf-8"),
+                                        digest_size=16).digest())
+        self.techs[entry.get("input", "").split(",", 1)[0].replace("Tech: ", "")] += 1
+        self.instructions[entry.get("instruction", "")] += 1
+        self.hints[hint_of(entry)] += 1
+        return True
+
+    def filter(self, entries: Iterable[Dict]) -> Iterable[Dict]:
+        for entry in entries:
+            if self.check(entry):
+                yield entry
+
+    def stats(self) -> Dict:
+        return {
+            "seen": self.seen,
+            "kept": self.kept,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "duplicate_rate": round(1 - self.kept / self.seen, 6) if self.seen else 0.0,
+            "distinct_inputs": self.inputs.count,
+            "near_threshold": round(self.lsh.threshold, 3) if self.lsh else None,
+            "entropy_bits": {
+                "tech": round(entropy(self.techs), 4),
+                "instruction": round(entropy(self.instructions), 4),
+                "hint": round(entropy(self.hints), 4),
+            },
+            "distribution": {
+                "tech": dict(self.techs),
+                "instruction": dict(self.instructions),
+                "hint": dict(self.hints),
+            },
+            "filter_bytes": self.exact.nbytes + self.inputs.nbytes +
+                            (self.lsh.nbytes if self.lsh else 0),
+        }
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Deduplicate a generated JSONL dataset.")
+    parser.add_argument("input", help="JSONL file to read")
+    parser.add_argument("-o", "--output", help="write kept records here")
+    parser.add_argument("--near", action="store_true", help="also drop near duplicates")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="expected distinct records (default: input line count)")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--stats", help="write diversity statistics JSON here")
+    args = parser.parse_args(argv)
+
+    capacity = args.capacity
+    if capacity is None:
+        with open(args.input, "rb") as f:
+            capacity = sum(1 for _ in f)
+
+    deduper = Deduper(capacity, near=args.near, error_rate=args.error_rate)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        with open(args.input, "r", encoding="utf-8") as f:
+            for line in f:
+                if deduper.check(json.loads(line)) and out:
+                    out.write(line)
+    finally:
+        if out:
+            out.close()
+
+    stats = deduper.stats()
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, ensure_ascii=False)
+    print(json.dumps({k: v for k, v in stats.items() if k != "distribution"},
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Output writers for generated datasets
+
+- JSONL, optionally gzip or zstd compressed (chosen by file suffix)
+- Parquet (needs pyarrow): instruction/input/output string columns,
+  dictionary encoded and zstd compressed, so repeated trees cost little
+- Size-bounded shards with a manifest (records, bytes, sha256, seed)
+
+Lines are buffered and written in large blocks.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+BLOCK_SIZE = 4 * 1024 * 1024   # Bytes buffered before each write
+PARQUET_BATCH_ROWS = 50000     # Rows per Parquet row group
+COLUMNS = ("instruction", "input", "output")
+
+SUFFIXES = {
+    ("jsonl", None): ".jsonl",
+    ("jsonl", "gzip"): ".jsonl.gz",
+    ("jsonl", "zstd"): ".jsonl.zst",
+    ("parquet", None): ".parquet",
+}
+
+# ------------------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------------------
+
+def check_available(fmt: str, compression: Optional[str]):
+    """Raise RuntimeError when the format needs a missing package."""
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+    if fmt == "jsonl" and compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstd output needs zstandard (pip install zstandard)")
+    if fmt == "parquet" and compression not in (None, "zstd"):
+        raise RuntimeError("Parquet output is always zstd compressed")
+
+def output_path(path: str, fmt: str = "jsonl", compression: Optional[str] = None) -> str:
+    """`path` with the suffix for fmt/compression (data.jsonl -> data.jsonl.gz)."""
+    suffix = SUFFIXES[(fmt, None if fmt == "parquet" else compression)]
+    for known in sorted(set(SUFFIXES.values()), key=len, reverse=True):
+        if path.endswith(known):
+            path = path[:-len(known)]
+            break
+    return path + suffix
+
+def detect(path: str) -> Dict:
+    """{'format', 'compression'} from a file suffix."""
+    for (fmt, compression), suffix in SUFFIXES.items():
+        if path.endswith(suffix) and (fmt, compression) != ("jsonl", None):
+            return {"format": fmt, "compression": compression}
+    return {"format": "jsonl", "compression": None}
+
+def open_binary(path: str, mode: str = "rb"):
+    """Open a (possibly compressed) JSONL file as a binary stream."""
+    compression = detect(path)["compression"]
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd files need zstandard (pip install zstandard)")
+        raw = open(path, mode)
+        if "r" in mode:
+            return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    return open(path, mode)
+
+def iter_lines(path: str) -> Iterator[str]:
+    """JSON lines of a JSONL (any compression) or Parquet file."""
+    if detect(path)["format"] == "parquet":
+        if pyarrow is None:
+            raise RuntimeError("Parquet files need pyarrow (pip install pyarrow)")
+        parquet = pyarrow.parquet.ParquetFile(path)
+        for batch in parquet.iter_batches():
+            for row in batch.to_pylist():
+                yield json.dumps(row, ensure_ascii=False) + "\n"
+        return
+    with open_binary(path, "rb") as raw:
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            yield line
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def describe(path: str, records: int) -> Dict:
+    """Manifest entry for a finished file."""
+    return {
+        "path": os.path.basename(path),
+        "records": records,
+        "bytes": os.path.getsize(path),
+        "sha256": file_sha256(path),
+    }
+
+def write_manifest(path: str, files: List[Dict], seed: Optional[int] = None,
+                   fmt: str = "jsonl", compression: Optional[str] = None,
+                   meta: Optional[Dict] = None) -> Dict:
+    manifest = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "format": fmt,
+        "compression": compression,
+        "records": sum(f["records"] for f in files),
+        "bytes": sum(f["bytes"] for f in files),
+        "shards": files,
+    }
+    if meta:
+        manifest["meta"] = meta
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+def manifest_path(output: str) -> str:
+    stem = output_path(output, "jsonl")[:-len(".jsonl")]
+    return f"{stem}.manifest.json"
+
+# ------------------------------------------------------------------------------
+# Writers
+# ------------------------------------------------------------------------------
+
+class JsonlWriter:
+    """JSONL writer; compression follows the path suffix."""
+
+    def __init__(self, path: str, block_size: int = BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self.stream = open_binary(path, "wb")
+        self.buffer = []
+        self.buffered = 0
+        self.records = 0
+        self.raw_bytes = 0
+
+    def write_line(self, line: str):
+        data = line.encode("utf-8")
+        self.buffer.append(data)
+        self.buffered += len(data)
+        self.records += 1
+        self.raw_bytes += len(data)
+        if self.buffered >= self.block_size:
+            self.flush()
+
+    def write(self, entry: Dict):
+        self.write_line(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write(b"".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class ParquetWriter:
+    """Parquet writer (pyarrow); rows are buffered into row groups."""
+
+    def __init__(self, path: str, batch_rows: int = PARQUET_BATCH_ROWS):
+        check_available("parquet", None)
+        self.path = path
+        self.batch_rows = batch_rows
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression="zstd", use_dictionary=True
+        )
+        self.columns = {name: [] for name in COLUMNS}
+        self.records = 0
+        self.raw_bytes = 0
+
+    def write(self, entry: Dict):
+        for name in COLUMNS:
+            value = entry.get(name, "")
+            self.columns[name].append(value)
+            self.raw_bytes += len(value.encode("utf-8"))
+        self.records += 1
+        if len(self.columns[COLUMNS[0]]) >= self.batch_rows:
+            self.flush()
+
+    def write_line(self, line: str):
+        self.write(json.loads(line))
+
+    def flush(self):
+        if self.columns[COLUMNS[0]]:
+            table = pyarrow.table(self.columns, schema=self.schema)
+            self.writer.write_table(table)
+            self.columns = {name: [] for name in COLUMNS}
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def open_writer(path: str, fmt: str = "jsonl"):
+    return ParquetWriter(path) if fmt == "parquet" else JsonlWriter(path)
+
+class ShardedWriter:
+    """
+    Rolls over to a new shard once `max_bytes` of uncompressed JSON has
+    been written, and writes a manifest on close. Shards are named
+    <stem>-part-00000<suffix> next to the manifest.
+    """
+
+    def __init__(self, output: str, fmt: str = "jsonl", compression: Optional[str] = None,
+                 max_bytes: int = 256 * 1024 * 1024, seed: Optional[int] = None,
+                 meta: Optional[Dict] = None):
+        self.output = output
+        self.fmt = fmt
+        self.compression = None if fmt == "parquet" else compression
+        self.max_bytes = max_bytes
+        self.seed = seed
+        self.meta = meta
+        self.files = []
+        self.paths = []
+        self.current = None
+        self.records = 0
+        stem = output_path(output, "jsonl")[:-len(".jsonl")]
+        self.template = f"{stem}-part-{{:05d}}{SUFFIXES[(fmt, self.compression)]}"
+
+    def _roll(self):
+        self._finish()
+        path = self.template.format(len(self.paths))
+        self.paths.append(path)
+        self.current = open_writer(path, self.fmt)
+
+    def _finish(self):
+        if self.current is not None:
+            self.current.close()
+            self.files.append(describe(self.current.path, self.current.records))
+            self.current = None
+
+    def write_line(self, line: str):
+        if self.current is None or self.current.raw_bytes >= self.max_bytes:
+            self._roll()
+        self.current.write_line(line)
+        self.records += 1
+
+    def write(self, entry: Dict):
+        self.write_line(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._finish()
+        self.manifest = write_manifest(manifest_path(self.output), self.files, self.seed,
+                                       self.fmt, self.compression, self.meta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -27,17 +27,19 @@ class EvolutionEngine:
         """Evolve the system"""
         print("🔄 सिस्टम इवोल्व हो रहा है...")
         
-        # Analyze conversations
-        self.analyze_conversations()
-        
-        # Improve responses
-        self.improve_responses()
-        
-        # Optimize memory
-        self.optimize_memory()
-        
-        # Record evolution
-        self.record_evolution()
+        # One pass over memory; saves and backups wait for it
+        with self.memory.lock:
+            # Analyze conversations
+            self.analyze_conversations()
+            
+            # Improve responses
+            self.improve_responses()
+            
+            # Optimize memory
+            self.optimize_memory()
+            
+            # Record evolution
+            self.record_evolution()
         
         print("✅ इवोल्यूशन पूर्ण")
         
@@ -126,11 +128,6 @@ class EvolutionEngine:
         if len(conversations) > 1000:
             self.memory.data["conversations"] = conversations[-1000:]
             
-        # Remove old notifications
-        notifications = self.memory.data.get("notifications", [])
-        if len(notifications) > 500:
-            self.memory.data["notifications"] = notifications[-500:]
-            
         # Compress learnings
         if "learnings" in self.memory.data:
             for key in list(self.memory.data["learnings"].keys()):
@@ -195,15 +192,9 @@ class EvolutionEngine:
                 
     def backup_critical_data(self):
         """Backup critical data"""
-        critical_data = {
-            "learned_patterns": self.memory.data.get("learned_patterns", {}),
-            "user_preferences": self.memory.data.get("user_preferences", {}),
-            "evolution_data": self.memory.data.get("evolution_data", {})
-        }
-        
-        backup_file = self.memory.memory_file.with_suffix('.critical.backup')
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(critical_data, f, indent=2, ensure_ascii=False)
+        # Deduplicated snapshot: sections unchanged since the last one
+        # (usually everything but conversations) cost nothing
+        self.memory.backup()
             
     def get_default_config(self):
         """Get default configuration"""
@@ -36,6 +36,7 @@ echo -e "${YELLOW}📄 फाइल्स कॉपी हो रही है
 cp *.py ~/.nova/
 cp *.json ~/.nova/ 2>/dev/null || true
 cp *.sh ~/.nova/
+cp -r templates ~/.nova/
 
 # Make scripts executable
 chmod +x ~/.nova/*.py
@@ -4,12 +4,14 @@
 फुली ऑटोनोमस, सेल्फ-लर्निंग, एडबी-कंट्रोल्ड
 """
 
+import time
+
+_STARTED = time.perf_counter()
+
 import os
 import sys
 import json
-import time
 import threading
-import subprocess
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -17,14 +19,9 @@ from pathlib import Path
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-# Import modules
-from nova_core import NovaCore
-from ai_engine import AIEngine
-from adb_controller import ADBController
-from notification_monitor import NotificationMonitor
-from voice_system import VoiceSystem
-from memory_manager import MemoryManager
-from evolution_engine import EvolutionEngine
+# Import modules (subsystems are imported lazily, see component factories)
+from metrics import metrics
+from nova_logging import setup_logging, stop_logging
 
 class NovaAssistant:
     def __init__(self):
@@ -36,7 +33,12 @@ class NovaAssistant:
         # Configuration
         self.config_file = self.nova_dir / "config.json"
         self.memory_file = self.nova_dir / "abheraj.json"
-        self.log_file = self.nova_dir / "nova.log"
+        self.log_dir = self.nova_dir / "logs"
+        self.metrics_file = self.nova_dir / "metrics.json"
+        
+        # Load configuration
+        self.config = self.load_config()
+        metrics.enabled = self.config.get('metrics_enabled', True)
         
         # Setup logging
         self.setup_logging()
@@ -44,21 +46,15 @@ class NovaAssistant:
         # Initialize components
         self.log("🚀 नोवा असिस्टेंट शुरू हो रही है...")
         
-        # Load configuration
-        self.config = self.load_config()
-        
-        # Initialize core systems
-        self.memory = MemoryManager(self.memory_file)
-        self.adb = ADBController(self.config['adb_host'])
-        self.ai = AIEngine(self.config, self.memory)
-        self.voice = VoiceSystem(self.config)
-        self.notifications = NotificationMonitor(self.adb, self.ai, self.memory)
-        self.evolution = EvolutionEngine(self.memory, self.config)
+        # Core systems are built on first use
+        self._components = {}
+        self._component_lock = threading.RLock()
         
         # State variables
         self.is_running = True
         self.is_silent = False
         self.last_command_time = 0
+        self.last_frame = None
         
         # Threads
         self.threads = []
@@ -72,25 +68,91 @@ class NovaAssistant:
             "humor_level": 0.7
         }
         
+    def component(self, name, factory):
+        """Get component, creating it on first use"""
+        component = self._components.get(name)
+        if component is None:
+            with self._component_lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = self._components[name] = factory()
+        return component
+        
+    @property
+    def memory(self):
+        def create():
+            from memory_manager import MemoryManager
+            # Load in background so the prompt is not held up
+            return MemoryManager(
+                self.memory_file,
+                background=True,
+                backup_keep=self.config.get('backup_keep', 10),
+                backup_compression=self.config.get('backup_compression'),
+                serializer=self.config.get('memory_format', 'json')
+            )
+        return self.component('memory', create)
+        
+    @property
+    def adb(self):
+        def create():
+            from adb_controller import ADBController
+            return ADBController(self.config['adb_host'])
+        return self.component('adb', create)
+        
+    @property
+    def ai(self):
+        def create():
+            from ai_engine import AIEngine
+            return AIEngine(self.config, self.memory)
+        return self.component('ai', create)
+        
+    @property
+    def voice(self):
+        def create():
+            from voice_system import VoiceSystem
+            return VoiceSystem(self.config)
+        return self.component('voice', create)
+        
+    @property
+    def notifications(self):
+        def create():
+            from notification_monitor import NotificationMonitor
+            return NotificationMonitor(self.adb, self.ai, self.memory, self.config)
+        return self.component('notifications', create)
+        
+    @property
+    def evolution(self):
+        def create():
+            from evolution_engine import EvolutionEngine
+            return EvolutionEngine(self.memory, self.config)
+        return self.component('evolution', create)
+        
+    @property
+    def screen(self):
+        def create():
+            from screen_monitor import ScreenMonitor
+            return ScreenMonitor(self.adb, self.config)
+        return self.component('screen', create)
+        
     def setup_logging(self):
-        """Setup logging system"""
-        logging.basicConfig(
-            filename=self.log_file,
-            level=logging.DEBUG,
-            format='%(asctime)s | %(levelname)s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+        """Setup logging system
+
+        Records are queued and written by a background listener as
+        rotated JSON lines under ~/.nova/logs, so callers never block
+        on file or console I/O.
+        """
+        self.logger, self.log_listener = setup_logging(
+            self.log_dir,
+            level=self.config.get('log_level', 'INFO'),
+            max_bytes=self.config.get('log_max_bytes', 1024 * 1024),
+            backup_count=self.config.get('log_backup_count', 3)
         )
-        self.logger = logging.getLogger('Nova')
+        # Screen loop messages are rate-limited (see SAMPLED_LOGGERS)
+        self.screen_logger = logging.getLogger('Nova.screen')
         
     def log(self, message, level="INFO"):
         """Log messages"""
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-        if level == "INFO":
-            self.logger.info(message)
-        elif level == "ERROR":
-            self.logger.error(message)
-        elif level == "WARNING":
-            self.logger.warning(message)
+        self.logger.log(getattr(logging, level, logging.INFO), message)
             
     def load_config(self):
         """Load or create configuration"""
@@ -98,14 +160,36 @@ class NovaAssistant:
             "name": "Nova",
             "adb_host": "localhost:5555",
             "auto_reply": True,
+            "auto_reply_window": 3,
+            "auto_reply_contact_interval": 60,
+            "auto_reply_global_per_minute": 10,
+            "auto_reply_slo_ms": 15000,
+            "contact_state_ttl": 86400,
+            "contact_greeting_interval": 1800,
             "voice_enabled": True,
             "ai_backend": "huggingchat",  # sambanova, huggingchat, local
             "learning_rate": 0.1,
+            "context_token_budget": 1024,
             "backup_interval": 300,
+            "backup_keep": 10,
+            "memory_format": "json",
+            "max_notifications": 500,
+            "low_priority_batch_interval": 30,
             "screen_monitoring": True,
+            "screen_state_ttl": 10,
+            "screen_save": False,
+            "screen_capture_scale": 1,
+            "screen_change_threshold": 0.05,
+            "screen_interval_min": 1,
+            "screen_interval_max": 30,
             "notification_check_interval": 2,
             "max_memory_entries": 1000,
-            "personality": "friendly_secretary"
+            "metrics_enabled": True,
+            "metrics_interval": 60,
+            "personality": "friendly_secretary",
+            "log_level": "INFO",
+            "log_max_bytes": 1048576,
+            "log_backup_count": 3
         }
         
         if self.config_file.exists():
@@ -130,15 +214,12 @@ class NovaAssistant:
         
         # 1. ADB Connection
         if not self.adb.connect():
-            self.log("❌ ADB कनेक्शन विफल, रिट्राइंग...", "WARNING")
-            # Try to start ADB server
-            subprocess.run(["adb", "start-server"])
-            time.sleep(2)
-            self.adb.connect()
+            self.log("❌ ADB कनेक्शन विफल, बैकग्राउंड में रिट्राइंग...", "WARNING")
+            self.adb.reconnect_in_background()
             
         # 2. Notification Monitor (24/7)
         notif_thread = threading.Thread(
-            target=self.notifications.monitor_continuously,
+            target=lambda: self.notifications.monitor_continuously(),
             daemon=True
         )
         self.threads.append(notif_thread)
@@ -155,7 +236,7 @@ class NovaAssistant:
             
         # 4. Auto Evolution
         evolution_thread = threading.Thread(
-            target=self.evolution.continuous_evolution,
+            target=lambda: self.evolution.continuous_evolution(),
             daemon=True
         )
         self.threads.append(evolution_thread)
@@ -163,31 +244,52 @@ class NovaAssistant:
         
         # 5. Memory Backup
         backup_thread = threading.Thread(
-            target=self.memory.auto_backup,
+            target=lambda: self.memory.auto_backup(
+                self.config.get('backup_interval', 300)
+            ),
             daemon=True
         )
         self.threads.append(backup_thread)
         backup_thread.start()
         
+        # 6. Metrics dump
+        if metrics.enabled:
+            metrics.start_periodic_dump(
+                self.metrics_file,
+                self.config.get('metrics_interval', 60)
+            )
+        
     def monitor_screen(self):
         """Monitor device screen continuously"""
         self.log("👁️ स्क्रीन मॉनिटरिंग शुरू...")
+        self.screen.on_change(self.on_screen_changed)
         
         while self.is_running:
             try:
-                # Take screenshot every 5 seconds
-                screenshot_path = self.nova_dir / "screen.png"
-                self.adb.take_screenshot(str(screenshot_path))
-                
-                # Analyze screen content
-                # This can be extended for OCR, object detection, etc.
-                
-                time.sleep(5)
+                # Pause while the device is unreachable
+                if not self.adb.wait_until_connected(timeout=30):
+                    continue
+                    
+                # Capture only while the screen is on; interval adapts
+                # to how often it changes
+                time.sleep(self.screen.poll())
                 
             except Exception as e:
-                self.log(f"स्क्रीन मॉनिटरिंग त्रुटि: {e}", "ERROR")
+                self.screen_logger.error("स्क्रीन मॉनिटरिंग त्रुटि: %s", e)
                 time.sleep(10)
                 
+    def on_screen_changed(self, frame, distance):
+        """Handle screen changed event"""
+        self.last_frame = frame
+        self.screen_logger.debug("Screen changed (%.0f%%)", distance * 100)
+        
+        # Persist only when asked to
+        if self.config.get('screen_save', False):
+            frame.save(self.nova_dir / "screen.png")
+            
+        # Analyze screen content
+        # This can be extended for OCR, object detection, etc.
+        
     def listen_for_voice(self):
         """Listen for voice commands"""
         self.log("🎤 वॉयस लिसनिंग शुरू...")
@@ -287,6 +389,18 @@ class NovaAssistant:
         # This is simplified - you'd need proper NLP
         self.log("📱 मैसेजिंग हैंडल की जा रही है...")
         
+    def open_new_note(self):
+        """Open an empty note in Keep and focus its body"""
+        if not (self.adb.tap_element(resource_id="com.google.android.keep:id/new_note_button") or
+                self.adb.tap_element(content_desc="New text note")):
+            self.log("⚠️ नया नोट बटन नहीं मिला", "WARNING")
+            return False
+        time.sleep(0.5)
+        
+        # Focus note body
+        self.adb.tap_element(resource_id="com.google.android.keep:id/edit_note_text")
+        return True
+        
     def take_note(self, command):
         """Take note in notes app"""
         note_text = command.replace("नोट", "").replace("note", "").strip()
@@ -296,8 +410,8 @@ class NovaAssistant:
         time.sleep(1)
         
         # Create new note
-        self.adb.tap(100, 100)  # New note button
-        time.sleep(0.5)
+        if not self.open_new_note():
+            return
         
         # Type note
         self.adb.type_text(note_text)
@@ -311,19 +425,16 @@ class NovaAssistant:
         """Write code in notes app"""
         code_topic = command.replace("कोड", "").replace("code", "").strip()
         
-        # Generate code using AI
-        code = self.ai.generate_code(code_topic)
-        
         # Open notes app
         self.adb.open_app("com.google.android.keep")
         time.sleep(1)
         
         # Create new note
-        self.adb.tap(100, 100)
-        time.sleep(0.5)
+        if not self.open_new_note():
+            return
         
-        # Type code
-        self.adb.type_text(f"# Code for: {code_topic}\n\n{code}")
+        # Type code as it is generated
+        self.adb.type_text_stream(self.ai.generate_code_stream(code_topic))
         
         self.log(f"💻 कोड जेनरेट किया गया: {code_topic}")
         
@@ -344,6 +455,28 @@ class NovaAssistant:
                     self.shutdown()
                     break
                     
+                # Performance stats
+                if user_input.lower() in ['stats', 'आंकड़े']:
+                    self.print_stats()
+                    continue
+                    
+                # Backups
+                if user_input.lower() in ['backups', 'बैकअप']:
+                    self.print_backups()
+                    continue
+                    
+                # "restore" or "restore <id>"; anything longer is a request
+                words = user_input.split()
+                if words[0].lower() == 'restore' and len(words) <= 2:
+                    self.restore_backup(words[1] if len(words) == 2 else None)
+                    continue
+                    
+                # JSON export of memory (for debugging compact formats)
+                if user_input.lower() == 'export':
+                    path = self.nova_dir / "memory_export.json"
+                    self.log(f"📤 मेमोरी एक्सपोर्ट: {self.memory.export_json(path)}")
+                    continue
+                    
                 # Process command
                 self.process_command(user_input, source="text")
                 
@@ -354,6 +487,49 @@ class NovaAssistant:
             except Exception as e:
                 self.log(f"इंटरैक्टिव मोड त्रुटि: {e}", "ERROR")
                 
+    def print_stats(self):
+        """Print latency and counter metrics"""
+        if not metrics.enabled:
+            print("📊 मेट्रिक्स बंद हैं (config: metrics_enabled)")
+            return
+        print(f"\n{'='*60}")
+        print(metrics.report())
+        if 'notifications' in self._components:
+            store = self.notifications.store
+            for package, count in sorted(store.packages_today().items()):
+                print(f"notifications.today.{package:<12} {count}")
+            slo = self.notifications.reply_slo.report()
+            if slo["count"]:
+                print(f"auto_reply.slo            target={slo['target_ms']}ms "
+                      f"n={slo['count']} violations={slo['violations']} "
+                      f"compliance={slo['compliance']:.1%}")
+                for violation in slo["recent_violations"][-5:]:
+                    print(f"  ⚠️ {violation['time']} {violation['label']} "
+                          f"{violation['latency_ms']:.0f}ms")
+            print(f"contacts.active           {len(self.notifications.contacts)}")
+        print(f"{'='*60}\n")
+        
+    def print_backups(self):
+        """List memory snapshots"""
+        snapshots = self.memory.list_backups()
+        if not snapshots:
+            print("💾 अभी कोई बैकअप नहीं है")
+            return
+        print(f"\n💾 बैकअप ({len(snapshots)}):")
+        for snapshot in snapshots:
+            conversations = len(snapshot["sections"].get("conversations", {}).get("chunks", []))
+            print(f"  {snapshot['id']}  {snapshot['created'][:19]}  "
+                  f"sections={len(snapshot['sections'])} conversation_chunks={conversations}")
+        print("रिस्टोर के लिए: restore <id>  (बिना id के = सबसे नया)\n")
+        
+    def restore_backup(self, snapshot_id=None):
+        """Restore memory from a snapshot"""
+        try:
+            self.memory.restore(snapshot_id)
+            self.log(f"♻️ मेमोरी बैकअप से रिस्टोर हुई ({snapshot_id or 'latest'})")
+        except (KeyError, FileNotFoundError, RuntimeError) as e:
+            self.log(f"रिस्टोर त्रुटि: {e}", "ERROR")
+        
     def print_welcome(self):
         """Print welcome message"""
         print("\n" + "🌟" * 30)
@@ -367,6 +543,9 @@ class NovaAssistant:
         print("- 'नोट [टेक्स्ट]' - नया नोट बनाएं")
         print("- 'कोड [टॉपिक]' - कोड जेनरेट करें")
         print("- 'खोलो [ऐप]' - ऐप ओपन करें")
+        print("- 'stats' - परफॉर्मेंस आंकड़े देखें")
+        print("- 'backups' / 'restore [id]' - मेमोरी बैकअप देखें / रिस्टोर करें")
+        print("- 'export' - मेमोरी JSON में एक्सपोर्ट करें (~/.nova/memory_export.json)")
         print("- 'बंद' - प्रोग्राम बंद करें")
         print("\n" + "-" * 60)
         
@@ -375,21 +554,31 @@ class NovaAssistant:
         self.log("🔴 नोवा बंद हो रही है...")
         self.is_running = False
         
-        # Save memory
-        self.memory.save()
+        # Save memory (only if it was ever loaded)
+        if 'memory' in self._components:
+            self.memory.save()
+        
+        # Final metrics snapshot
+        if metrics.enabled:
+            metrics.dump(self.metrics_file)
         
         # Wait for threads
         for thread in self.threads:
             thread.join(timeout=1)
             
         self.log("✅ नोवा सफलतापूर्वक बंद हो गई")
+        stop_logging(self.log_listener)
         print("\nधन्यवाद! जल्द मिलते हैं। 👋")
         
     def run(self):
         """Main run method"""
         try:
-            # Start background services
-            self.start_background_services()
+            # Start background services without holding up the prompt
+            services_thread = threading.Thread(
+                target=self.start_background_services,
+                daemon=True
+            )
+            services_thread.start()
             
             # Start voice listening in background
             voice_thread = threading.Thread(
@@ -408,8 +597,71 @@ class NovaAssistant:
             traceback.print_exc()
             self.shutdown()
 
+def startup_report():
+    """Time cold start phases and write ~/.nova/startup.json
+
+    Run as `python -X importtime main.py --startup-report` to also get
+    per-module import times on stderr.
+    """
+    imported = time.perf_counter()
+    modules_at_import = len(sys.modules)
+    
+    assistant = NovaAssistant()
+    constructed = time.perf_counter()
+    
+    # What run() does before the prompt appears
+    memory = assistant.memory
+    prompt_ready = time.perf_counter()
+    modules_at_prompt = len(sys.modules)
+    heavy_at_prompt = [
+        name for name in ['requests', 'speech_recognition', 'evolution_engine']
+        if name in sys.modules
+    ]
+    
+    memory.wait_until_loaded()
+    memory_loaded = time.perf_counter()
+    
+    # First use of each lazily built component
+    first_use = {}
+    for name in ['adb', 'ai', 'notifications', 'screen', 'evolution', 'voice']:
+        start = time.perf_counter()
+        try:
+            getattr(assistant, name)
+            first_use[name] = round((time.perf_counter() - start) * 1000, 3)
+        except Exception as e:
+            first_use[name] = f"error: {e}"
+            
+    def ms(end, start=_STARTED):
+        return round((end - start) * 1000, 3)
+        
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "import_main_ms": ms(imported),
+        "construct_ms": ms(constructed, imported),
+        "prompt_ready_ms": ms(prompt_ready),
+        "memory_loaded_ms": ms(memory_loaded),
+        "memory_entries": len(memory.data.get("conversations", [])),
+        "first_use_ms": first_use,
+        "modules_at_import": modules_at_import,
+        "modules_at_prompt": modules_at_prompt,
+        "modules_total": len(sys.modules),
+        "heavy_modules_at_prompt": heavy_at_prompt,
+    }
+    
+    report_file = assistant.nova_dir / "startup.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+        
+    print(json.dumps(report, indent=2))
+    print(f"\n📊 स्टार्टअप रिपोर्ट सेव: {report_file}")
+    stop_logging(assistant.log_listener)
+    
 def main():
     """Entry point"""
+    if "--startup-report" in sys.argv:
+        startup_report()
+        return
+        
     print("Initializing Nova Assistant...")
     
     # Check if running in Termux
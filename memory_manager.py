@@ -1,23 +1,128 @@
+import copy
 import json
+import logging
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
+import serializers
+from backup_store import BackupStore
+from metrics import metrics
+
+logger = logging.getLogger('Nova.memory')
+
 class MemoryManager:
-    def __init__(self, memory_file):
-        self.memory_file = Path(memory_file)
-        self.data = self.load_memory()
+    def __init__(self, memory_file, background=False, backup_keep=10,
+                 backup_compression=None, serializer="json"):
+        self.serializer = serializers.get_serializer(serializer)
+        # The suffix follows the format (abheraj.json -> abheraj.nova)
+        self.memory_file = Path(memory_file).with_suffix(self.serializer.suffix)
+        self.backups = BackupStore(self.memory_file.parent / "backups",
+                                   keep=backup_keep,
+                                   compression=backup_compression)
+        self._data = None
+        self._loaded = threading.Event()
+        self.exporters = {}
+        self.loaders = {}
+        self.migrate_from = None
+        # Held by anything that mutates or reads all of data
+        self.lock = threading.RLock()
+        
+        if background:
+            # Callers touching .data block until the load finishes
+            threading.Thread(target=self._load, daemon=True).start()
+        else:
+            self._load()
+            
+    def _load(self):
+        try:
+            self._data = self.load_memory()
+        finally:
+            self._loaded.set()
+            
+    @property
+    def data(self):
+        if not self._loaded.is_set():
+            self._loaded.wait()
+        return self._data
+        
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._loaded.set()
+        
+    def wait_until_loaded(self, timeout=None):
+        """Block until memory is loaded"""
+        return self._loaded.wait(timeout)
+        
+    def register_section(self, name, exporter, loader=None):
+        """Have `exporter()` supply data[name] whenever memory is written
+        
+        Lets components keep their own in-memory structures and only
+        materialize them for save/backup. `loader()` is called after
+        restore() replaces data, so the owner rebuilds from it instead of
+        exporting its stale state over the restored section.
+        """
+        self.exporters[name] = exporter
+        if loader is not None:
+            self.loaders[name] = loader
+        
+    def refresh_sections(self):
+        """Pull registered sections into data"""
+        for name, exporter in list(self.exporters.items()):
+            self.data[name] = exporter()
+            
+    def other_format_files(self):
+        """Memory files written in formats other than the configured one"""
+        return [
+            self.memory_file.with_suffix(other.suffix)
+            for other in serializers.SERIALIZERS.values()
+            if other.suffix != self.memory_file.suffix
+        ]
+        
+    def find_memory_files(self):
+        """Existing memory files, newest first
+        
+        Includes files written in another format so switching
+        memory_format migrates on the next save instead of starting over.
+        """
+        candidates = [path for path in [self.memory_file] + self.other_format_files()
+                      if path.exists()]
+        return sorted(candidates, key=lambda path: path.stat().st_mtime, reverse=True)
         
     def load_memory(self):
-        """Load memory from file"""
-        if self.memory_file.exists():
+        """Load memory from the newest readable file"""
+        for path in self.find_memory_files():
             try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return self.create_default_memory()
-        else:
-            return self.create_default_memory()
+                with open(path, 'rb') as f:
+                    data = serializers.load(f.read())
+                if not isinstance(data, dict):
+                    raise ValueError(f"expected an object, got {type(data).__name__}")
+            except RuntimeError as e:
+                # Missing optional package: the file is fine, leave it alone
+                logger.error("Cannot read memory file %s: %s", path, e)
+                continue
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                # Keep the unreadable file; the next save would overwrite it
+                aside = path.with_name(f"{path.name}.corrupt-{datetime.now():%Y%m%d%H%M%S}")
+                logger.error("Unreadable memory file %s (%s), moved to %s", path, e, aside.name)
+                try:
+                    path.rename(aside)
+                except OSError as rename_error:
+                    logger.error("Could not move %s aside: %s", path, rename_error)
+                continue
+                
+            # Older memories nested the last conversations in each context
+            for conversation in data.get("conversations", []):
+                context = conversation.get("context")
+                if isinstance(context, dict):
+                    context.pop("last_5_conversations", None)
+            if path != self.memory_file:
+                self.migrate_from = path
+            return data
+            
+        return self.create_default_memory()
             
     def create_default_memory(self):
         """Create default memory structure"""
@@ -39,32 +144,77 @@ class MemoryManager:
             }
         }
         
+    @metrics.timed("memory.save")
     def save(self):
         """Save memory to file"""
-        # Create backup
-        if self.memory_file.exists():
-            backup_file = self.memory_file.with_suffix('.json.backup')
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-                
-        # Save current
-        with open(self.memory_file, 'w', encoding='utf-8') as f:
+        # Write-then-rename, so a crash mid-save never leaves a torn file
+        # (snapshots live in the backup store, see backup())
+        with self.lock:
+            self.refresh_sections()
+            payload = self.serializer.dumps(self.data)
+        temp_file = self.memory_file.with_name(self.memory_file.name + '.tmp')
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_file, self.memory_file)
+        
+        # After a format switch the file we loaded is stale; keep it out
+        # of the way so it is never loaded instead of this one
+        migrated, self.migrate_from = self.migrate_from, None
+        if migrated is not None and migrated.exists():
+            os.replace(migrated, migrated.with_name(migrated.name + '.migrated'))
+        
+    def export_json(self, path):
+        """Write memory as indented JSON (for debugging)"""
+        with open(path, 'w', encoding='utf-8') as f:
             json.dump(self.data, f, indent=2, ensure_ascii=False)
+        return path
+        
+    @metrics.timed("memory.backup")
+    def backup(self):
+        """Snapshot memory into the backup store; returns the manifest"""
+        # Chunking is slow; do it on a copy so other threads are not held up
+        with self.lock:
+            self.refresh_sections()
+            data = copy.deepcopy(self.data)
+        return self.backups.snapshot(data)
+        
+    def list_backups(self):
+        """Available snapshots, newest first"""
+        return self.backups.list_snapshots()
+        
+    def restore(self, snapshot_id=None):
+        """Replace memory with a snapshot (latest by default) and save"""
+        with self.lock:
+            # Load the target before the safety snapshot below: that one
+            # becomes the newest (and would match a date prefix) and its
+            # prune could drop the target's chunks
+            data = self.backups.restore(snapshot_id)
+            # Keep a snapshot of what we are about to overwrite
+            self.backup()
+            self.data = data
+            # One owner may back several sections; reload each owner once
+            for loader in dict.fromkeys(self.loaders.values()):
+                loader()
+            self.save()
             
     def add_conversation(self, user_input, nova_response):
         """Add conversation to memory"""
+        now = datetime.now()
+        # Only time/date: storing get_context() here nested every earlier
+        # conversation inside each new one
         conversation = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "user": user_input,
             "nova": nova_response,
-            "context": self.get_context()
+            "context": {"time": now.strftime("%H:%M"), "date": now.strftime("%Y-%m-%d")}
         }
         
-        self.data["conversations"].append(conversation)
-        
-        # Keep only last 500 conversations
-        if len(self.data["conversations"]) > 500:
-            self.data["conversations"] = self.data["conversations"][-500:]
+        with self.lock:
+            self.data["conversations"].append(conversation)
+            
+            # Keep only last 500 conversations
+            if len(self.data["conversations"]) > 500:
+                self.data["conversations"] = self.data["conversations"][-500:]
             
         # Auto-save
         self.save()
@@ -74,34 +224,39 @@ class MemoryManager:
         return {
             "time": datetime.now().strftime("%H:%M"),
             "date": datetime.now().strftime("%Y-%m-%d"),
-            "last_5_conversations": self.data["conversations"][-5:] if len(self.data["conversations"]) >= 5 else self.data["conversations"]
+            "last_5_conversations": self.data["conversations"][-5:]
         }
         
     def add_learning(self, pattern, response):
         """Add learning pattern"""
-        if pattern not in self.data["learnings"]:
-            self.data["learnings"][pattern] = []
-            
-        self.data["learnings"][pattern].append({
-            "response": response,
-            "timestamp": datetime.now().isoformat(),
-            "used_count": 0
-        })
+        with self.lock:
+            if pattern not in self.data["learnings"]:
+                self.data["learnings"][pattern] = []
+                
+            self.data["learnings"][pattern].append({
+                "response": response,
+                "timestamp": datetime.now().isoformat(),
+                "used_count": 0
+            })
         
     def get_learning(self, pattern):
         """Get learning for pattern"""
         return self.data["learnings"].get(pattern, [])
         
-    def auto_backup(self):
-        """Auto-backup memory"""
+    def auto_backup(self, interval=300):
+        """Save and snapshot memory every `interval` seconds"""
         import time
-        import threading
         
         def backup_loop():
             while True:
-                time.sleep(300)  # 5 minutes
-                self.save()
-                print("💾 मेमोरी ऑटो-बैकअप किया गया")
+                time.sleep(interval)
+                try:
+                    self.save()
+                    stats = self.backup()["stats"]
+                    print(f"💾 मेमोरी ऑटो-बैकअप किया गया "
+                          f"({stats['new_chunks']} नए, {stats['reused_chunks']} पुराने चंक्स)")
+                except Exception as e:
+                    print(f"बैकअप त्रुटि: {e}")
                 
         thread = threading.Thread(target=backup_loop, daemon=True)
         thread.start()
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from pathlib import Path
+
+class Histogram:
+    """Latency samples in a fixed-size ring buffer"""
+
+    __slots__ = ("samples", "count", "total", "max", "lock")
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def summary(self):
+        """Percentiles over the ring buffer, totals over all time"""
+        # Copy under the lock: sorting a deque other threads append to
+        # raises "deque mutated during iteration"
+        with self.lock:
+            samples = list(self.samples)
+            count, total, peak = self.count, self.total, self.max
+        samples.sort()
+        if not samples:
+            return {"count": count}
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+        return {
+            "count": count,
+            "mean": round(total / count, 3),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(peak, 3),
+        }
+
+class LatencySLO:
+    """Latency objective (milliseconds) with a log of recent violations"""
+
+    def __init__(self, name, target_ms, registry=None, keep=50):
+        self.name = name
+        self.target_ms = target_ms
+        self.registry = registry
+        self.count = 0
+        self.violations = 0
+        self.recent = deque(maxlen=keep)
+        self.lock = threading.Lock()
+
+    def record(self, latency_ms, label=""):
+        """Observe a latency; returns True if it met the target"""
+        if self.registry is not None:
+            self.registry.observe(self.name, latency_ms)
+        met = latency_ms <= self.target_ms
+        with self.lock:
+            self.count += 1
+            if not met:
+                self.violations += 1
+                self.recent.append((time.time(), label, round(latency_ms, 1)))
+        if not met and self.registry is not None:
+            self.registry.incr(f"{self.name}.slo_violations")
+        return met
+
+    def report(self):
+        with self.lock:
+            recent = list(self.recent)
+        return {
+            "target_ms": self.target_ms,
+            "count": self.count,
+            "violations": self.violations,
+            "compliance": round(1 - self.violations / self.count, 4) if self.count else None,
+            "recent_violations": [
+                {"time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(at)),
+                 "label": label, "latency_ms": latency}
+                for at, label, latency in recent
+            ],
+        }
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """Counters and latency histograms (milliseconds)
+
+    Disabled metrics cost one attribute check per call.
+    """
+
+    def __init__(self, enabled=True, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._dump_thread = None
+
+    def incr(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram(self.window))
+        histogram.observe(value)
+
+    def timer(self, name):
+        """Context manager timing a block"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """Decorator timing every call of a function"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        return {
+            "timestamp": time.time(),
+            "uptime": round(time.time() - self.started, 1),
+            "counters": dict(self.counters),
+            "latency_ms": {name: h.summary() for name, h in list(self.histograms.items())},
+        }
+
+    def dump(self, path):
+        """Write snapshot as JSON (atomically)"""
+        path = Path(path)
+        temp = path.with_suffix(path.suffix + ".tmp")
+        temp.write_text(json.dumps(self.snapshot(), indent=2))
+        temp.replace(path)
+
+    def start_periodic_dump(self, path, interval=60):
+        """Dump to path every `interval` seconds on a daemon thread"""
+        if self._dump_thread and self._dump_thread.is_alive():
+            return
+
+        def dump_loop():
+            while True:
+                time.sleep(interval)
+                if self.enabled:
+                    try:
+                        self.dump(path)
+                    except Exception as e:
+                        print(f"Metrics dump error: {e}")
+
+        self._dump_thread = threading.Thread(target=dump_loop, daemon=True)
+        self._dump_thread.start()
+
+    def report(self):
+        """Human-readable summary"""
+        snap = self.snapshot()
+        lines = [f"⏱️ अपटाइम: {snap['uptime']}s"]
+
+        for name, stats in sorted(snap["latency_ms"].items()):
+            if "p50" not in stats:
+                continue
+            lines.append(
+                f"{name:<24} n={stats['count']:<6} p50={stats['p50']:.1f}ms "
+                f"p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms max={stats['max']:.1f}ms"
+            )
+
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"{name:<24} {value}")
+
+        return "\n".join(lines)
+
+# Process-wide registry
+metrics = Metrics()
@@ -1,32 +1,123 @@
 import time
 import re
-from datetime import datetime
+import logging
+
+from auto_reply import AutoReplyScheduler
+from contact_state import ContactStates
+from metrics import LatencySLO, metrics
+from notification_store import NotificationStore
+from notification_triage import URGENT, NotificationTriage, TriageRules
+
+logger = logging.getLogger('Nova.notifications')
+
+MESSAGING_APPS = {
+    'com.whatsapp',
+    'com.instagram.android',
+    'com.facebook.orca',
+    'org.telegram.messenger'
+}
+
+# Chat screen widgets per messaging app
+CHAT_UI = {
+    'com.whatsapp': {
+        'input': 'com.whatsapp:id/entry',
+        'send': 'com.whatsapp:id/send'
+    },
+    'com.instagram.android': {
+        'input': 'com.instagram.android:id/row_thread_composer_edittext',
+        'send_desc': 'Send'
+    },
+    'com.facebook.orca': {
+        'send_desc': 'Send'
+    },
+    'org.telegram.messenger': {
+        'send_desc': 'Send'
+    }
+}
 
 class NotificationMonitor:
-    def __init__(self, adb, ai, memory):
+    def __init__(self, adb, ai, memory, config=None):
         self.adb = adb
         self.ai = ai
         self.memory = memory
+        self.config = config or {}
         self.last_notifications = []
         
+        # History + per-app/sender aggregates, persisted through memory
+        self.store = NotificationStore(
+            capacity=self.config.get('max_notifications', 500)
+        )
+        
+        # Ongoing chats per (package, sender), also persisted
+        self.contacts = ContactStates(ttl=self.config.get('contact_state_ttl', 86400))
+        
+        self.load_sections()
+        self.memory.register_section('notifications', self.store.export_events,
+                                     self.load_sections)
+        self.memory.register_section('notification_stats', self.store.export_stats,
+                                     self.load_sections)
+        self.memory.register_section('contacts', self.contacts.export, self.load_sections)
+        
+        # Urgent first; blocked dropped, low-value batched
+        self.triage = NotificationTriage(
+            TriageRules(self.config, MESSAGING_APPS, sender_func=self.get_sender),
+            self.process_notification,
+            self.process_low_batch,
+            batch_interval=self.config.get('low_priority_batch_interval', 30)
+        )
+        
+        # Notification seen -> reply sent
+        self.reply_slo = LatencySLO(
+            "auto_reply.latency",
+            self.config.get('auto_reply_slo_ms', 15000),
+            registry=metrics
+        )
+        
+        # Replies run on their own worker, batched per sender
+        self.replies = AutoReplyScheduler(
+            self.auto_reply,
+            key_func=self.conversation_key,
+            window=self.config.get('auto_reply_window', 3),
+            contact_interval=self.config.get('auto_reply_contact_interval', 60),
+            global_per_minute=self.config.get('auto_reply_global_per_minute', 10)
+        )
+        
+    def load_sections(self):
+        """(Re)build the store and contact table from memory"""
+        self.store.clear()
+        self.store.load(
+            self.memory.data.get('notifications', []),
+            self.memory.data.get('notification_stats'),
+            sender_func=self.get_sender
+        )
+        self.contacts.clear()
+        self.contacts.load(self.memory.data.get('contacts'))
+        
     def monitor_continuously(self):
         """Monitor notifications 24/7"""
         print("🔔 नोटिफिकेशन मॉनिटरिंग शुरू (24/7)...")
+        self.replies.start()
+        self.triage.start()
         
         while True:
             try:
-                # Check screen state
-                screen_state = self.adb.get_screen_state()
-                
-                # Get notifications
-                notifications = self.adb.get_notifications()
+                # Pause while the device is unreachable
+                if not self.adb.wait_until_connected(timeout=30):
+                    continue
+                    
+                # Screen state + notifications in one round trip
+                state = self.adb.get_device_state(
+                    screen_ttl=self.config.get('screen_state_ttl', 10)
+                )
+                screen_state = state.screen_state
+                notifications = state.notifications
                 
                 # Check for new notifications
                 new_notifs = self.get_new_notifications(notifications)
                 
-                # Process new notifications
-                for notif in new_notifs:
-                    self.process_notification(notif, screen_state)
+                # Hand new notifications to triage (acted on by priority)
+                metrics.incr("notifications.new", len(new_notifs))
+                self.triage.submit_all(new_notifs, screen_state)
                     
                 # Update last notifications
                 self.last_notifications = notifications
@@ -35,7 +126,7 @@ class NotificationMonitor:
                 time.sleep(2)
                 
             except Exception as e:
-                print(f"Notification monitoring error: {e}")
+                logger.warning("Notification monitoring error: %s", e)
                 time.sleep(5)
                 
     def get_new_notifications(self, current_notifs):
@@ -62,21 +153,40 @@ class NotificationMonitor:
                 return False
         return True
         
-    def process_notification(self, notification, screen_state):
+    @metrics.timed("notifications.process")
+    def process_notification(self, notification, screen_state, priority=None):
         """Process a notification"""
-        print(f"📱 नया नोटिफिकेशन: {notification.get('title', 'No title')}")
+        if priority == URGENT:
+            print(f"🚨 ज़रूरी नोटिफिकेशन: {notification.get('title', 'No title')}")
+        else:
+            print(f"📱 नया नोटिफिकेशन: {notification.get('title', 'No title')}")
         
-        # Speak notification if screen is off
-        if screen_state == "OFF":
+        # Speak notification if screen is off (emergency contacts always)
+        if screen_state == "OFF" or priority == URGENT:
             self.speak_notification(notification)
             
-        # Auto-reply for messaging apps
+        if notification.get('package') in MESSAGING_APPS:
+            self.contacts.message(self.conversation_key(notification),
+                                  notification.get('text', ''))
+            
+        # Auto-reply for messaging apps (queued, never blocks polling)
         if self.should_auto_reply(notification):
-            self.auto_reply(notification)
+            self.replies.submit(notification)
             
         # Save to memory
         self.save_notification(notification)
         
+    @metrics.timed("notifications.process_batch")
+    def process_low_batch(self, notifications):
+        """Save low-priority notifications with a single summary line"""
+        apps = {}
+        for notification in notifications:
+            app_name = self.get_app_name(notification.get('package', ''))
+            apps[app_name] = apps.get(app_name, 0) + 1
+            self.save_notification(notification)
+        summary = ", ".join(f"{app} ({count})" for app, count in apps.items())
+        print(f"🔕 {len(notifications)} कम ज़रूरी नोटिफिकेशन: {summary}")
+        
     def speak_notification(self, notification):
         """Speak notification aloud"""
         title = notification.get('title', '')
@@ -99,38 +209,51 @@ class NotificationMonitor:
         
     def should_auto_reply(self, notification):
         """Check if should auto-reply"""
-        package = notification.get('package', '')
-        
-        # Check if from messaging app
-        messaging_apps = [
-            'com.whatsapp',
-            'com.instagram.android',
-            'com.facebook.orca',
-            'org.telegram.messenger'
-        ]
-        
-        if package in messaging_apps:
-            return True
+        if not self.config.get('auto_reply', True):
+            return False
             
-        return False
+        # Check if from messaging app
+        return notification.get('package', '') in MESSAGING_APPS
         
     def auto_reply(self, notification):
         """Auto-reply to notification"""
         print(f"🤖 ऑटो-रिप्लाई तैयार कर रही हूं...")
         
         # Extract sender and message
-        sender = notification.get('title', '').split(':')[0]
+        sender = self.get_sender(notification)
         message = notification.get('text', '')
+        key = self.conversation_key(notification)
         
-        # Generate reply
-        reply = self.generate_reply(sender, message)
+        # Generate reply (no second hello within the same chat)
+        greeted = self.contacts.replied_within(
+            key, self.config.get('contact_greeting_interval', 1800)
+        )
+        reply = self.generate_reply(sender, message, greeted)
         
         # Open app and send reply
-        self.send_reply(notification['package'], sender, reply)
+        if not self.send_reply(notification['package'], sender, reply):
+            return
+            
+        state = self.contacts.reply(key, reply)
+        metrics.incr("auto_reply.sent")
         
-        print(f"✅ रिप्लाई भेज दी: {reply[:50]}...")
+        if 'seen' in notification:
+            latency_ms = (time.monotonic() - notification['seen']) * 1000
+            if not self.reply_slo.record(latency_ms, f"{notification['package']}/{sender}"):
+                logger.warning("Auto-reply SLO missed for %s: %.0f ms (target %s ms)",
+                               sender, latency_ms, self.reply_slo.target_ms)
+                
+        print(f"✅ रिप्लाई भेज दी [{state.thread_id}]: {reply[:50]}...")
+        
+    def get_sender(self, notification):
+        """Extract sender name from notification title"""
+        return notification.get('title', '').split(':')[0]
+        
+    def conversation_key(self, notification):
+        """Key used to batch replies per conversation"""
+        return (notification.get('package', ''), self.get_sender(notification))
         
-    def generate_reply(self, sender, message):
+    def generate_reply(self, sender, message, greeted=False):
         """Generate automatic reply"""
         # Simple rule-based replies
         greetings = ['hi', 'hello', 'नमस्ते', 'हैलो']
@@ -138,8 +261,16 @@ class NotificationMonitor:
         
         message_lower = message.lower()
         
+        # Already greeted in this chat: just acknowledge
+        if greeted and any(greet in message_lower for greet in greetings):
+            replies = [
+                f"जी {sender}, मैंने बॉस को बता दिया है।",
+                f"जी, आपका मैसेज बॉस तक पहुंच गया है।",
+                f"ठीक है {sender}, बॉस जल्द रिप्लाई देंगे।"
+            ]
+            
         # Check for greeting
-        if any(greet in message_lower for greet in greetings):
+        elif any(greet in message_lower for greet in greetings):
             replies = [
                 f"हैलो {sender}! मैं नोवा हूं, आपके बॉस की असिस्टेंट।",
                 f"नमस्ते {sender}! बॉस अभी व्यस्त हैं, मैं उन्हें बता दूंगी।",
@@ -167,27 +298,38 @@ class NotificationMonitor:
         
     def send_reply(self, package, sender, reply):
         """Send reply via ADB"""
-        # This is a simplified version
-        # Actual implementation would need to:
+        print(f"📤 रिप्लाई भेजी जा रही है...")
+        print(f"ऐप: {package}")
+        print(f"सेंडर: {sender}")
+        print(f"रिप्लाई: {reply}")
+        
+        ui = CHAT_UI.get(package, {})
+        
         # 1. Open the app
-        # 2. Navigate to chat
+        self.adb.open_app(package)
+        time.sleep(2)
+        
+        # 2. Navigate to chat (fresh dump: the list reorders on every message)
+        if not self.adb.tap_element(text=sender, refresh=True):
+            print(f"⚠️ चैट नहीं मिली: {sender}")
+            return False
+        time.sleep(1)
+        
         # 3. Type reply
-        # 4. Send
+        if ui.get('input'):
+            self.adb.tap_element(resource_id=ui['input'])
+        self.adb.type_text(reply)
         
-        # For now, just log
-        print(f"📤 रिप्लाई भेजी जा रही है...")
-        print(f"ऐप: {package}")
-        print(fसेंडर: {sender}")
-        print(fरिप्लाई: {reply}")
-        
-        # You would implement actual ADB commands here
-        # Example:
-        # self.adb.open_app(package)
-        # time.sleep(2)
-        # self.adb.tap(x, y)  # Tap on chat
-        # time.sleep(1)
-        # self.adb.type_text(reply)
-        # self.adb.press_key(66)  # Send
+        # 4. Send
+        sent = False
+        if ui.get('send'):
+            sent = self.adb.tap_element(resource_id=ui['send'])
+        elif ui.get('send_desc'):
+            sent = self.adb.tap_element(content_desc=ui['send_desc'])
+        if not sent:
+            self.adb.press_key(66)  # Enter
+            
+        return True
         
     def get_app_name(self, package):
         """Get app name from package"""
@@ -203,12 +345,4 @@ class NotificationMonitor:
         
     def save_notification(self, notification):
         """Save notification to memory"""
-        if 'notifications' not in self.memory.data:
-            self.memory.data['notifications'] = []
-            
-        notification['timestamp'] = datetime.now().isoformat()
-        self.memory.data['notifications'].append(notification)
-        
-        # Keep only last 100 notifications
-        if len(self.memory.data['notifications']) > 100:
-            self.memory.data['notifications'] = self.memory.data['notifications'][-100:]
+        self.store.add(notification, self.get_sender(notification))
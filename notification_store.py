@@ -0,0 +1,209 @@
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+
+class Tally:
+    """Counts per package and per (package, sender)
+
+    Stored as {package: {"total": n, "senders": {sender: n}}} so it
+    serializes as-is.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts=None):
+        self.counts = counts if counts is not None else {}
+
+    def add(self, package, sender):
+        entry = self.counts.get(package)
+        if entry is None:
+            entry = self.counts[package] = {"total": 0, "senders": {}}
+        entry["total"] += 1
+        if sender:
+            entry["senders"][sender] = entry["senders"].get(sender, 0) + 1
+
+    def export(self):
+        """Copy safe to serialize while inserts continue"""
+        return {package: {"total": entry["total"], "senders": dict(entry["senders"])}
+                for package, entry in self.counts.items()}
+
+    def count(self, package=None, sender=None):
+        if package is None:
+            if sender is None:
+                return sum(entry["total"] for entry in self.counts.values())
+            return sum(entry["senders"].get(sender, 0) for entry in self.counts.values())
+        entry = self.counts.get(package)
+        if entry is None:
+            return 0
+        if sender is None:
+            return entry["total"]
+        return entry["senders"].get(sender, 0)
+
+class NotificationStore:
+    """Bounded notification history with incremental aggregates
+
+    Raw notifications live in a ring buffer of `capacity` entries; counts
+    per package/sender are kept all-time, per day and per hour and updated
+    on insert, so queries never walk the raw history.
+    """
+
+    def __init__(self, capacity=500, hours=48, days=30):
+        self.capacity = capacity
+        self.hours = hours
+        self.days = days
+        self.events = deque(maxlen=capacity)
+        self.totals = Tally()
+        self.hourly = OrderedDict()
+        self.daily = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def hour_key(moment):
+        return moment.strftime("%Y-%m-%dT%H")
+
+    @staticmethod
+    def day_key(moment):
+        return moment.strftime("%Y-%m-%d")
+
+    def _bucket(self, buckets, key, limit):
+        tally = buckets.get(key)
+        if tally is None:
+            tally = buckets[key] = Tally()
+            # Keys arrive in time order, so the oldest bucket is first
+            while len(buckets) > limit:
+                buckets.popitem(last=False)
+        return tally
+
+    # --------------------------------------------------------------------------
+    # Insert
+    # --------------------------------------------------------------------------
+
+    def add(self, notification, sender=None, now=None):
+        """Record a notification (O(1))"""
+        now = now or datetime.now()
+        notification['timestamp'] = now.isoformat()
+        # Monotonic arrival time from triage; meaningless once persisted
+        notification.pop('seen', None)
+        package = notification.get('package', '')
+
+        with self.lock:
+            self.events.append(notification)
+            self.totals.add(package, sender)
+            self._bucket(self.hourly, self.hour_key(now), self.hours).add(package, sender)
+            self._bucket(self.daily, self.day_key(now), self.days).add(package, sender)
+
+    # --------------------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------------------
+
+    def count_total(self, package=None, sender=None):
+        """All-time count"""
+        with self.lock:
+            return self.totals.count(package, sender)
+
+    def count_today(self, package=None, sender=None, now=None):
+        """e.g. count_today('com.whatsapp', 'Ravi')"""
+        return self.count_day(self.day_key(now or datetime.now()), package, sender)
+
+    def count_day(self, day, package=None, sender=None):
+        """Count for a YYYY-MM-DD day (within the last `days`)"""
+        with self.lock:
+            tally = self.daily.get(day)
+            return tally.count(package, sender) if tally else 0
+
+    def count_last_hours(self, hours, package=None, sender=None, now=None):
+        """Count over the last `hours` hour buckets (current hour included)"""
+        now = now or datetime.now()
+        total = 0
+        with self.lock:
+            for offset in range(min(hours, self.hours)):
+                tally = self.hourly.get(self.hour_key(now - timedelta(hours=offset)))
+                if tally:
+                    total += tally.count(package, sender)
+        return total
+
+    def hourly_counts(self, package=None, sender=None):
+        """{hour: count} for the retained hour buckets"""
+        with self.lock:
+            return {hour: tally.count(package, sender)
+                    for hour, tally in self.hourly.items()}
+
+    def top_senders(self, package=None, limit=5, day=None):
+        """Most frequent senders, all-time or for a YYYY-MM-DD day"""
+        counts = {}
+        with self.lock:
+            tally = self.totals if day is None else self.daily.get(day)
+            if tally is None:
+                return []
+            for name, entry in tally.counts.items():
+                if package is None or name == package:
+                    for sender, n in entry["senders"].items():
+                        counts[sender] = counts.get(sender, 0) + n
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def packages_today(self, now=None):
+        """{package: count} for today"""
+        with self.lock:
+            tally = self.daily.get(self.day_key(now or datetime.now()))
+            if tally is None:
+                return {}
+            return {package: entry["total"] for package, entry in tally.counts.items()}
+
+    def recent(self, limit=10):
+        """Newest notifications first"""
+        with self.lock:
+            items = list(self.events)[-limit:]
+        return items[::-1]
+
+    # --------------------------------------------------------------------------
+    # Persistence (memory sections)
+    # --------------------------------------------------------------------------
+
+    def export_events(self):
+        with self.lock:
+            return list(self.events)
+
+    def export_stats(self):
+        with self.lock:
+            return {
+                "totals": self.totals.export(),
+                "hourly": {key: tally.export() for key, tally in self.hourly.items()},
+                "daily": {key: tally.export() for key, tally in self.daily.items()},
+            }
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+            self.totals = Tally()
+            self.hourly = OrderedDict()
+            self.daily = OrderedDict()
+
+    def load(self, events=None, stats=None, sender_func=None):
+        """Restore from memory sections
+
+        Without saved stats (memories written before the store existed)
+        the aggregates are rebuilt from the raw events.
+        """
+        with self.lock:
+            self.events.extend(events or [])
+
+            if stats:
+                self.totals = Tally(stats.get("totals", {}))
+                self.hourly = OrderedDict(
+                    (key, Tally(counts)) for key, counts in sorted(stats.get("hourly", {}).items())
+                )
+                self.daily = OrderedDict(
+                    (key, Tally(counts)) for key, counts in sorted(stats.get("daily", {}).items())
+                )
+                return
+
+            for notification in self.events:
+                try:
+                    moment = datetime.fromisoformat(notification['timestamp'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                package = notification.get('package', '')
+                sender = sender_func(notification) if sender_func else None
+                self.totals.add(package, sender)
+                self._bucket(self.hourly, self.hour_key(moment), self.hours).add(package, sender)
+                self._bucket(self.daily, self.day_key(moment), self.days).add(package, sender)
@@ -0,0 +1,174 @@
+import itertools
+import queue
+import threading
+import time
+from datetime import datetime
+
+from metrics import metrics
+
+# Lower value = handled first
+URGENT = 0
+HIGH = 1
+NORMAL = 2
+LOW = 3
+PRIORITY_NAMES = {URGENT: "urgent", HIGH: "high", NORMAL: "normal", LOW: "low"}
+
+def parse_minutes(value, default):
+    """'HH:MM' -> minutes after midnight"""
+    try:
+        hours, minutes = str(value).split(":", 1)
+        return int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return default
+
+class TriageRules:
+    """Config lists compiled into sets and minute ranges
+
+    - blocked_apps: dropped before anything else happens
+    - emergency_contacts: urgent, from any app, at any hour
+    - messaging apps: high during working hours, normal outside
+    - low_priority_apps: batched; everything else is normal
+    """
+
+    def __init__(self, config, messaging_apps=(), sender_func=None):
+        self.low_priority = frozenset(config.get('low_priority_apps') or ())
+        self.blocked = frozenset(config.get('blocked_apps') or ())
+        self.emergency = frozenset(
+            str(contact).strip().lower() for contact in config.get('emergency_contacts') or ()
+        )
+        self.messaging = frozenset(messaging_apps)
+        hours = config.get('working_hours') or {}
+        self.work_start = parse_minutes(hours.get('start'), 0)
+        self.work_end = parse_minutes(hours.get('end'), 24 * 60)
+        self.sender_func = sender_func or (lambda n: n.get('title', '').split(':')[0])
+
+    def in_working_hours(self, now=None):
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        if self.work_start <= self.work_end:
+            return self.work_start <= minute < self.work_end
+        # Overnight shift, e.g. 22:00-06:00
+        return minute >= self.work_start or minute < self.work_end
+
+    def classify(self, notification, now=None):
+        """Priority for a notification, or None to drop it"""
+        package = notification.get('package', '')
+        if package in self.blocked:
+            return None
+        if self.emergency and self.sender_func(notification).strip().lower() in self.emergency:
+            return URGENT
+        if package in self.messaging:
+            return HIGH if self.in_working_hours(now) else NORMAL
+        if package in self.low_priority:
+            return LOW
+        return NORMAL
+
+class NotificationTriage:
+    """Classify notifications on arrival and act on them by priority
+
+    The polling thread only classifies (set lookups) and enqueues; a
+    worker takes items from a priority queue, so an emergency message
+    never waits behind a burst of routine ones. Low-priority items are
+    collected and handed over as one batch every `batch_interval`
+    seconds (or `batch_size` items).
+    """
+
+    def __init__(self, rules, handle, handle_batch, batch_interval=30, batch_size=20):
+        self.rules = rules
+        self.handle = handle
+        self.handle_batch = handle_batch
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.low = []
+        self.low_since = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.is_running = False
+
+    def start(self):
+        """Start worker thread (idempotent)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+
+    def submit(self, notification, screen_state=None):
+        """Classify and enqueue; returns the priority (None if dropped)"""
+        arrived = time.monotonic()
+        # Reply latency (auto-reply SLO) is measured from here
+        notification.setdefault('seen', arrived)
+        priority = self.rules.classify(notification)
+
+        if priority is None:
+            metrics.incr("triage.dropped")
+            return None
+
+        if priority == LOW:
+            metrics.incr("triage.batched")
+            with self.lock:
+                if not self.low:
+                    self.low_since = arrived
+                self.low.append(notification)
+                full = len(self.low) >= self.batch_size
+            if full:
+                self.flush_low()
+            return priority
+
+        # Sequence keeps arrival order within a priority (dicts don't compare)
+        self.queue.put((priority, next(self.sequence), arrived, notification, screen_state))
+        return priority
+
+    def submit_all(self, notifications, screen_state=None):
+        for notification in notifications:
+            self.submit(notification, screen_state)
+
+    def flush_low(self):
+        """Queue the pending low-priority items as one batch"""
+        with self.lock:
+            batch, self.low = self.low, []
+            arrived, self.low_since = self.low_since, None
+        if batch:
+            self.queue.put((LOW, next(self.sequence), arrived, batch, None))
+
+    def run(self):
+        """Worker loop"""
+        while self.is_running:
+            with self.lock:
+                due = self.low_since is not None and \
+                    time.monotonic() - self.low_since >= self.batch_interval
+            if due:
+                self.flush_low()
+
+            try:
+                item = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            try:
+                self.act(*item)
+            except Exception as e:
+                print(f"Triage error: {e}")
+
+    def act(self, priority, _sequence, arrived, payload, screen_state):
+        metrics.observe(f"triage.wait.{PRIORITY_NAMES[priority]}",
+                        (time.monotonic() - arrived) * 1000)
+        if priority == LOW:
+            self.handle_batch(payload)
+        else:
+            self.handle(payload, screen_state, priority)
+
+    def drain(self):
+        """Act on everything queued now, on the calling thread"""
+        self.flush_low()
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.act(*item)
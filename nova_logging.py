@@ -0,0 +1,123 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from datetime import datetime
+from pathlib import Path
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Rate-limit repeated messages from tight loops
+
+    Allows `burst` records per message template (the unformatted msg) every
+    `interval` seconds and counts what it drops; the count is appended to
+    the next record that gets through.
+    """
+
+    def __init__(self, interval=60, burst=5, max_keys=2048):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.max_keys = max_keys
+        self.windows = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.CRITICAL:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, record.levelno, str(record.msg))
+        window = self.windows.get(key)
+
+        if window is None or now - window[0] >= self.interval:
+            if len(self.windows) >= self.max_keys:
+                self.windows.clear()
+            dropped = window[2] if window else 0
+            self.windows[key] = [now, 1, 0]
+            if dropped:
+                record.msg = f"{record.msg} (+{dropped} suppressed)"
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        return False
+
+# Child loggers of polling loops; only these are rate-limited, so
+# interactive output and one-off errors are never dropped
+SAMPLED_LOGGERS = ("notifications", "screen")
+
+def setup_logging(log_dir, name="Nova", level="INFO", max_bytes=1024 * 1024,
+                  backup_count=3, console=True, sampled=SAMPLED_LOGGERS):
+    """Attach a queue-backed logging pipeline to the `name` logger
+
+    Callers only enqueue records; a QueueListener thread formats them and
+    writes JSON lines to a size-rotated file (plus the console). The
+    `sampled` child loggers get a SamplingFilter. Returns (logger,
+    listener); stop the listener on shutdown to flush.
+    """
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "nova.jsonl",
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(
+            logging.Formatter("[%(asctime)s] %(message)s", datefmt="%H:%M:%S")
+        )
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    # Logger filters only see records logged on that logger itself
+    for child in sampled:
+        child_logger = logging.getLogger(f"{name}.{child}")
+        for old in [f for f in child_logger.filters if isinstance(f, SamplingFilter)]:
+            child_logger.removeFilter(old)
+        child_logger.addFilter(SamplingFilter())
+
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.handlers[:] = [queue_handler]
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(stop_logging, listener)
+
+    return logger, listener
+
+def stop_logging(listener):
+    """Flush queued records and stop the listener (safe to call twice)"""
+    if listener._thread is not None:
+        listener.stop()
@@ -0,0 +1,91 @@
+import struct
+import zlib
+from pathlib import Path
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class Frame:
+    """In-memory screen capture
+
+    Holds the bytes returned by `screencap` without copying them: raw
+    captures keep a memoryview over the RGBA pixels past the header,
+    PNG captures keep the encoded image as-is.
+    """
+
+    def __init__(self, data, width=0, height=0, fmt="png", pixels=None):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.format = fmt
+        self.pixels = pixels if pixels is not None else memoryview(data)
+
+    @classmethod
+    def from_raw(cls, data):
+        """Parse raw `screencap` output (header + RGBA pixels)"""
+        if len(data) < 12:
+            return None
+
+        width, height = struct.unpack_from("<II", data, 0)
+        size = width * height * 4
+        # Android 8+ appends a colorspace word: header is 12 or 16 bytes
+        header = len(data) - size
+        if width == 0 or height == 0 or header not in (12, 16):
+            return None
+
+        pixels = memoryview(data)[header:]
+        return cls(data, width, height, "rgba", pixels)
+
+    @classmethod
+    def from_png(cls, data):
+        """Wrap `screencap -p` output"""
+        if not data.startswith(PNG_SIGNATURE):
+            return None
+
+        width, height = struct.unpack_from(">II", data, 16)
+        return cls(data, width, height, "png")
+
+    @property
+    def nbytes(self):
+        return len(self.pixels)
+
+    def downscale(self, factor):
+        """Return a frame keeping every `factor`-th pixel in both axes"""
+        if factor <= 1 or self.format != "rgba":
+            return self
+
+        # One 32-bit word per pixel, so rows can be strided without decoding
+        words = self.pixels.cast("I")
+        width = self.width
+        rows = [
+            words[y * width:(y + 1) * width:factor].tobytes()
+            for y in range(0, self.height, factor)
+        ]
+        data = b"".join(rows)
+        return Frame(data, len(range(0, width, factor)), len(rows), "rgba")
+
+    def to_png(self):
+        """Encode frame as PNG bytes"""
+        if self.format == "png":
+            return bytes(self.data)
+
+        stride = self.width * 4
+        pixels = self.pixels
+        # Filter type 0 (None) for every scanline
+        raw = b"".join(
+            b"\x00" + pixels[y * stride:(y + 1) * stride].tobytes()
+            for y in range(self.height)
+        )
+
+        def chunk(tag, body):
+            return (struct.pack(">I", len(body)) + tag + body +
+                    struct.pack(">I", zlib.crc32(tag + body) & 0xffffffff))
+
+        ihdr = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (PNG_SIGNATURE + chunk(b"IHDR", ihdr) +
+                chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+    def save(self, path):
+        """Write frame to disk as PNG"""
+        data = self.to_png()
+        Path(path).write_bytes(data)
+        return len(data)
@@ -0,0 +1,147 @@
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class FrameDiffer:
+    """Cheap change detector for screen frames
+
+    Reduces a frame to a grid of average luminance values (an average-hash
+    style signature) and reports a change when enough grid cells moved.
+    """
+
+    def __init__(self, grid=16, threshold=0.05, cell_threshold=12, samples=4):
+        self.grid = grid
+        self.threshold = threshold
+        self.cell_threshold = cell_threshold
+        self.samples = samples
+        self.last_signature = None
+
+    def reset(self):
+        """Forget the previous frame"""
+        self.last_signature = None
+
+    def signature(self, frame):
+        """Compute grid signature for a frame"""
+        if frame.format != "rgba":
+            # Encoded frames can only be compared byte-for-byte
+            return zlib.crc32(frame.pixels)
+
+        if np is not None:
+            return self._signature_numpy(frame)
+        return self._signature_python(frame)
+
+    def _signature_numpy(self, frame):
+        grid = self.grid
+        pixels = np.frombuffer(frame.pixels, dtype=np.uint8)
+        pixels = pixels.reshape(frame.height, frame.width, 4)
+
+        # Subsample before converting so a full-HD frame stays cheap
+        step = max(1, min(frame.height, frame.width) // (grid * self.samples))
+        sub = pixels[::step, ::step, :3]
+        rows = (sub.shape[0] // grid) * grid
+        cols = (sub.shape[1] // grid) * grid
+        sub = sub[:rows, :cols].astype(np.float32)
+
+        luma = sub @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        blocks = luma.reshape(grid, rows // grid, grid, cols // grid)
+        return blocks.mean(axis=(1, 3))
+
+    def _signature_python(self, frame):
+        grid = self.grid
+        samples = self.samples
+        width, height = frame.width, frame.height
+        words = frame.pixels.cast("I")
+
+        cell_w = width / grid
+        cell_h = height / grid
+        signature = []
+        for gy in range(grid):
+            for gx in range(grid):
+                total = 0
+                for sy in range(samples):
+                    y = int((gy + (sy + 0.5) / samples) * cell_h)
+                    row = y * width
+                    for sx in range(samples):
+                        x = int((gx + (sx + 0.5) / samples) * cell_w)
+                        p = words[row + x]
+                        total += ((p & 0xff) * 299 +
+                                  ((p >> 8) & 0xff) * 587 +
+                                  ((p >> 16) & 0xff) * 114)
+                signature.append(total / (1000 * samples * samples))
+        return signature
+
+    def distance(self, a, b):
+        """Fraction of grid cells that changed (0.0 - 1.0)"""
+        if isinstance(a, int) or isinstance(b, int):
+            return 0.0 if a == b else 1.0
+
+        if np is not None and isinstance(a, np.ndarray):
+            if a.shape != b.shape:
+                return 1.0
+            return float(np.mean(np.abs(a - b) > self.cell_threshold))
+
+        if len(a) != len(b):
+            return 1.0
+        changed = sum(1 for x, y in zip(a, b) if abs(x - y) > self.cell_threshold)
+        return changed / len(a)
+
+    def update(self, frame):
+        """Compare frame with the previous one; returns (changed, distance)"""
+        signature = self.signature(frame)
+        previous = self.last_signature
+        self.last_signature = signature
+
+        if previous is None:
+            return True, 1.0
+
+        distance = self.distance(previous, signature)
+        return distance >= self.threshold, distance
+
+class ScreenMonitor:
+    """Change-gated screen capture with an adaptive interval"""
+
+    def __init__(self, adb, config):
+        self.adb = adb
+        self.config = config
+        self.min_interval = config.get('screen_interval_min', 1)
+        self.max_interval = config.get('screen_interval_max', 30)
+        self.off_interval = config.get('screen_off_interval', 10)
+        self.scale = config.get('screen_capture_scale', 1)
+        self.state_ttl = config.get('screen_state_ttl', 10)
+        self.interval = 5
+        self.differ = FrameDiffer(
+            threshold=config.get('screen_change_threshold', 0.05)
+        )
+        self.listeners = []
+        self.last_frame = None
+
+    def on_change(self, callback):
+        """Register callback(frame, distance) for screen changed events"""
+        self.listeners.append(callback)
+
+    def poll(self):
+        """Run one capture cycle; returns seconds to wait before the next"""
+        # No point capturing a dark screen
+        if self.adb.get_screen_state(self.state_ttl) == "OFF":
+            self.differ.reset()
+            return self.off_interval
+
+        frame = self.adb.capture_frame(scale=self.scale)
+        if frame is None:
+            return self.interval
+
+        changed, distance = self.differ.update(frame)
+
+        # Busy screen -> poll faster, static screen -> back off
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+            self.last_frame = frame
+            for callback in self.listeners:
+                callback(frame, distance)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+
+        return self.interval
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Memory file serializers
+
+    json      indented JSON (the original format, human readable)
+    columnar  lists of records stored as one array per field, compact JSON
+    msgpack   MessagePack (needs the msgpack package)
+
+Binary formats start with a magic header so load() can tell them apart
+from legacy JSON files. Export any memory file as JSON for debugging:
+
+    python serializers.py ~/.nova/abheraj.nova > memory.json
+"""
+
+import json
+import sys
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Lists of dicts shorter than this are cheaper left as rows
+COLUMNAR_MIN_ROWS = 8
+COLUMNS_KEY = "__columns__"
+
+class JsonSerializer:
+    name = "json"
+    suffix = ".json"
+    magic = b""
+
+    def dumps(self, data):
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, payload):
+        return json.loads(payload.decode("utf-8"))
+
+class ColumnarSerializer:
+    """Records stored per field, so keys appear once per section
+
+    {"conversations": [{"user": "a", "nova": "b"}, ...]} is written as
+    {"conversations": {"": {"__columns__": ["user", "nova"], "rows": 2,
+                            "values": {"user": [...], "nova": [...]},
+                            "absent": {...}}}}
+
+    Field values live under "values" so record keys such as "rows" or
+    "absent" cannot clash with the block metadata.
+    """
+
+    name = "columnar"
+    suffix = ".nova"
+    magic = b"NOVACOL1\n"
+
+    def dumps(self, data):
+        body = json.dumps(self.encode(data), ensure_ascii=False,
+                          separators=(",", ":"))
+        return self.magic + body.encode("utf-8")
+
+    def loads(self, payload):
+        # object_hook runs bottom-up inside the C parser, so column blocks
+        # are turned back into records without a second pass over the tree
+        return json.loads(payload[len(self.magic):].decode("utf-8"),
+                          object_hook=self.decode_object)
+
+    def encode(self, value):
+        if type(value) is dict:
+            return {key: self.encode(item) if type(item) in (dict, list) else item
+                    for key, item in value.items()}
+        if type(value) is list:
+            if (len(value) >= COLUMNAR_MIN_ROWS and
+                    all(type(item) is dict for item in value)):
+                return self.encode_columns(value)
+            return [self.encode(item) if type(item) in (dict, list) else item
+                    for item in value]
+        return value
+
+    def encode_columns(self, records):
+        columns = {}
+        for record in records:
+            for key in record:
+                columns.setdefault(key, None)
+        columns = list(columns)
+
+        block = {COLUMNS_KEY: columns, "rows": len(records), "values": {}, "absent": {}}
+        for key in columns:
+            values = []
+            absent = []
+            for row, record in enumerate(records):
+                if key in record:
+                    values.append(self.encode(record[key]))
+                else:
+                    values.append(None)
+                    absent.append(row)
+            block["values"][key] = values
+            if absent:
+                block["absent"][key] = absent
+        return {"": block}
+
+    def decode_object(self, value):
+        block = value.get("")
+        if len(value) == 1 and type(block) is dict and COLUMNS_KEY in block:
+            return self.decode_columns(block)
+        return value
+
+    def decode_columns(self, block):
+        columns = block[COLUMNS_KEY]
+        values = block["values"]
+        if not columns:
+            return [{} for _ in range(block["rows"])]
+        if not block["absent"]:
+            return [dict(zip(columns, row))
+                    for row in zip(*(values[key] for key in columns))]
+
+        records = [{} for _ in range(block["rows"])]
+        for key in columns:
+            absent = set(block["absent"].get(key, ()))
+            for row, item in enumerate(values[key]):
+                if row not in absent:
+                    records[row][key] = item
+        return records
+
+class MsgpackSerializer:
+    name = "msgpack"
+    suffix = ".msgpack"
+    magic = b"NOVAMP1\n"
+
+    def dumps(self, data):
+        if msgpack is None:
+            raise RuntimeError("msgpack not installed (pip install msgpack)")
+        return self.magic + msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, payload):
+        if msgpack is None:
+            raise RuntimeError("msgpack not installed (pip install msgpack)")
+        return msgpack.unpackb(payload[len(self.magic):], raw=False,
+                               strict_map_key=False)
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (JsonSerializer(), ColumnarSerializer(), MsgpackSerializer())
+}
+
+def get_serializer(name):
+    """Serializer by name; falls back to JSON when msgpack is missing"""
+    if name == "msgpack" and msgpack is None:
+        print("⚠️ msgpack नहीं मिला, JSON मेमोरी फॉर्मेट इस्तेमाल हो रहा है")
+        name = "json"
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"unknown memory format: {name}") from None
+
+def detect(payload):
+    """Serializer that wrote payload (by magic header)"""
+    for serializer in SERIALIZERS.values():
+        if serializer.magic and payload.startswith(serializer.magic):
+            return serializer
+    return SERIALIZERS["json"]
+
+def load(payload):
+    return detect(payload).loads(payload)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print(__doc__.strip())
+        return 2
+    with open(argv[0], "rb") as f:
+        data = load(f.read())
+    sys.stdout.write(SERIALIZERS["json"].dumps(data).decode("utf-8") + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory_manager import MemoryManager
+
+def make_memory(tmp_path):
+    memory = MemoryManager(tmp_path / "memory.json")
+    memory.data["conversations"] = [{"user": "first"}]
+    memory.backup()
+    # Snapshot ids have microsecond resolution
+    time.sleep(0.01)
+    memory.data["conversations"].append({"user": "second"})
+    return memory
+
+def test_restore_latest_skips_safety_snapshot(tmp_path):
+    memory = make_memory(tmp_path)
+    memory.restore()
+    assert memory.data["conversations"] == [{"user": "first"}]
+
+def test_restore_by_id(tmp_path):
+    memory = make_memory(tmp_path)
+    snapshot_id = memory.list_backups()[0]["id"]
+    memory.restore(snapshot_id)
+    assert memory.data["conversations"] == [{"user": "first"}]
+
+def test_restore_rejects_ambiguous_prefix(tmp_path):
+    memory = make_memory(tmp_path)
+    memory.backup()
+    with pytest.raises(KeyError):
+        memory.restore(memory.list_backups()[0]["id"][:8])
+    assert len(memory.data["conversations"]) == 2
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serializers
+from serializers import COLUMNAR_MIN_ROWS, SERIALIZERS
+
+def roundtrip(data):
+    serializer = SERIALIZERS["columnar"]
+    return serializers.load(serializer.dumps(data))
+
+def test_columnar_field_names_match_metadata_keys():
+    records = [{"absent": i, "rows": str(i), "values": [i], "__columns__": None}
+               for i in range(COLUMNAR_MIN_ROWS)]
+    assert roundtrip({"items": records}) == {"items": records}
+
+def test_columnar_missing_fields():
+    records = [{"a": i} if i % 2 else {"b": i, "absent": {"x": i}}
+               for i in range(COLUMNAR_MIN_ROWS * 2)]
+    assert roundtrip({"items": records}) == {"items": records}
+
+def test_columnar_empty_records():
+    records = [{} for _ in range(COLUMNAR_MIN_ROWS)]
+    assert roundtrip({"items": records}) == {"items": records}
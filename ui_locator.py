@@ -0,0 +1,162 @@
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+class UIElement(namedtuple("UIElement",
+                           ["resource_id", "text", "content_desc", "bounds", "clickable"])):
+    """Compact view node from a uiautomator dump"""
+    __slots__ = ()
+
+    @property
+    def center(self):
+        x1, y1, x2, y2 = self.bounds
+        return (x1 + x2) // 2, (y1 + y2) // 2
+
+class UIIndex:
+    """Lookup tables over the elements of one window"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.by_id = {}
+        self.by_text = {}
+        self.by_desc = {}
+
+        for element in elements:
+            if element.resource_id:
+                self.by_id.setdefault(element.resource_id, []).append(element)
+            if element.text:
+                self.by_text.setdefault(element.text.lower(), []).append(element)
+            if element.content_desc:
+                self.by_desc.setdefault(element.content_desc.lower(), []).append(element)
+
+    def find(self, text=None, resource_id=None, content_desc=None, partial=False):
+        """Return first element matching all given fields"""
+        candidates = None
+        if resource_id:
+            candidates = self.by_id.get(resource_id, [])
+        if text and not partial:
+            matches = self.by_text.get(text.lower(), [])
+            candidates = matches if candidates is None else [e for e in candidates if e in matches]
+        if content_desc and not partial:
+            matches = self.by_desc.get(content_desc.lower(), [])
+            candidates = matches if candidates is None else [e for e in candidates if e in matches]
+
+        if candidates is None:
+            candidates = self.elements
+
+        if partial:
+            text = text.lower() if text else None
+            content_desc = content_desc.lower() if content_desc else None
+            candidates = [
+                e for e in candidates
+                if (not text or text in e.text.lower()) and
+                   (not content_desc or content_desc in e.content_desc.lower())
+            ]
+
+        # Prefer something that reacts to taps
+        for element in candidates:
+            if element.clickable:
+                return element
+        return candidates[0] if candidates else None
+
+class UILocator:
+    """uiautomator-based element locator
+
+    Dumps are slow (a second or more), so the parsed hierarchy is reused
+    while the focused window stays the same. Only the current window is
+    kept: coming back to an activity later (a chat list that reordered,
+    say) always dumps again rather than reusing stale coordinates.
+    """
+
+    def __init__(self, adb):
+        self.adb = adb
+        self.cached = None  # (window key, UIIndex)
+        self.hits = 0
+        self.misses = 0
+
+    def window_key(self):
+        """Hash of the focused window/activity (filtered on the phone)"""
+        output = self.adb.execute(
+            "dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'"
+        )
+        return hashlib.sha1(output.encode("utf-8")).hexdigest()
+
+    def dump(self):
+        """Fetch and parse the current view hierarchy"""
+        raw = self.adb.exec_out("uiautomator dump /dev/tty", timeout=20)
+        text = raw.decode("utf-8", "replace")
+
+        # Output is the XML followed by a status line
+        start = text.find("<?xml")
+        end = text.rfind("</hierarchy>")
+        if start < 0 or end < 0:
+            return []
+
+        return self.parse(text[start:end + len("</hierarchy>")])
+
+    @staticmethod
+    def parse(xml_text):
+        """Parse uiautomator XML into UIElement tuples"""
+        try:
+            root = ET.fromstring(xml_text)
+        except ET.ParseError:
+            return []
+
+        elements = []
+        for node in root.iter("node"):
+            match = BOUNDS_RE.match(node.get("bounds", ""))
+            if not match:
+                continue
+
+            resource_id = node.get("resource-id", "")
+            text = node.get("text", "")
+            content_desc = node.get("content-desc", "")
+            clickable = node.get("clickable") == "true"
+
+            # Skip anonymous layout containers
+            if not (resource_id or text or content_desc or clickable):
+                continue
+
+            elements.append(UIElement(
+                resource_id,
+                text,
+                content_desc,
+                tuple(int(v) for v in match.groups()),
+                clickable
+            ))
+
+        return elements
+
+    def index(self, refresh=False):
+        """Get element index for the current window"""
+        key = self.window_key()
+
+        if not refresh and self.cached is not None and self.cached[0] == key:
+            self.hits += 1
+            return self.cached[1]
+
+        self.misses += 1
+        self.cached = None
+        index = UIIndex(self.dump())
+        self.cached = (key, index)
+        return index
+
+    def find(self, text=None, resource_id=None, content_desc=None, partial=False,
+             refresh=False):
+        """Locate an element on the current screen
+
+        refresh=True always dumps first; use it for content that moves
+        without the window changing (lists, chats).
+        """
+        element = self.index(refresh).find(text, resource_id, content_desc, partial)
+        if element is None and not refresh:
+            # Window unchanged but content may have moved; dump once more
+            element = self.index(refresh=True).find(text, resource_id, content_desc, partial)
+        return element
+
+    def invalidate(self):
+        """Drop the cached hierarchy"""
+        self.cached = None
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Schema validator and profiler for generated datasets
+
+Streams JSONL (plain, gzip, zstd) or Parquet files, shards or a
+manifest, checks every record against the Generate.py schema across a
+process pool and writes a summary JSON: error counts with examples,
+length and token histograms, per-tech / per-feature distributions and
+hint frequencies. Memory stays constant: workers only keep counters.
+
+    python validate_dataset.py data.jsonl --workers 8 --summary summary.json
+    python validate_dataset.py data.manifest.json --mmap
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import dataset_writers
+from dataset_dedup import hint_of
+from Generate import FEATURES, INSTRUCTION_TEMPLATES, TECH_STACKS, VULN_HINTS
+
+RANGE_BYTES = 64 * 1024 * 1024    # Plain JSONL is split into ranges this size
+MAX_EXAMPLES = 20                 # Error examples kept per error type
+FIELDS = ("instruction", "input", "output")
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+INPUT_LABELS = {
+    "Fingerprinting": "fingerprinting",
+    "AI Pipeline": "ai_pipeline",
+    "Deception": "deception",
+    "Pipeline": "pipeline_stages",
+}
+HINT_CATEGORIES = {hint.split(":", 1)[0] for hint in VULN_HINTS}
+INSTRUCTIONS = set(INSTRUCTION_TEMPLATES)
+FEATURE_VALUES = {name: set(values) for name, values in FEATURES.items()}
+
+# ------------------------------------------------------------------------------
+# Profile (mergeable counters)
+# ------------------------------------------------------------------------------
+
+def bucket(value: int) -> int:
+    """Power-of-two histogram bucket (upper bound)."""
+    return 1 << max(0, value - 1).bit_length() if value > 0 else 0
+
+class Profile:
+    """Counters for a slice of the dataset; merge() combines slices."""
+
+    def __init__(self):
+        self.records = 0
+        self.valid = 0
+        self.errors = Counter()
+        self.examples = {}
+        self.lengths = {field: Counter() for field in FIELDS}
+        self.tokens = {field: Counter() for field in FIELDS}
+        self.totals = Counter()
+        self.maxima = Counter()
+        self.techs = Counter()
+        self.instructions = Counter()
+        self.features = {name: Counter() for name in FEATURES}
+        self.feature_present = Counter()
+        self.hints = Counter()
+
+    def error(self, kind: str, where: str, detail: str = ""):
+        self.errors[kind] += 1
+        examples = self.examples.setdefault(kind, [])
+        if len(examples) < MAX_EXAMPLES:
+            examples.append(f"{where}: {detail}"[:300])
+
+    def add_line(self, line: bytes, where: str):
+        self.records += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            self.error("invalid_json", where, str(e))
+            return
+        self.add_record(record, where)
+
+    def add_record(self, record, where: str):
+        if not isinstance(record, dict):
+            self.error("not_an_object", where, type(record).__name__)
+            return
+
+        ok = True
+        missing = [field for field in FIELDS if field not in record]
+        extra = [key for key in record if key not in FIELDS]
+        if missing:
+            self.error("missing_field", where, ", ".join(missing))
+            ok = False
+        if extra:
+            self.error("unexpected_field", where, ", ".join(extra))
+            ok = False
+
+        for field in FIELDS:
+            value = record.get(field)
+            if field in record and not isinstance(value, str):
+                self.error("not_a_string", where, field)
+                ok = False
+            elif isinstance(value, str):
+                if not value.strip():
+                    self.error("empty_field", where, field)
+                    ok = False
+                length = len(value)
+                tokens = len(TOKEN_RE.findall(value))
+                self.lengths[field][bucket(length)] += 1
+                self.tokens[field][bucket(tokens)] += 1
+                self.totals[f"{field}.chars"] += length
+                self.totals[f"{field}.tokens"] += tokens
+                self.maxima[f"{field}.chars"] = max(self.maxima[f"{field}.chars"], length)
+                self.maxima[f"{field}.tokens"] = max(self.maxima[f"{field}.tokens"], tokens)
+
+        if ok:
+            ok = self.check_content(record, where)
+        if ok:
+            self.valid += 1
+
+    def check_content(self, record: Dict, where: str) -> bool:
+        ok = True
+        instruction = record["instruction"]
+        self.instructions[instruction] += 1
+        if instruction not in INSTRUCTIONS:
+            self.error("unknown_instruction", where, instruction)
+            ok = False
+
+        parts = record["input"].split(", ")
+        if not parts[0].startswith("Tech: ") or parts[0][6:] not in TECH_STACKS:
+            self.error("unknown_tech", where, parts[0])
+            ok = False
+        else:
+            self.techs[parts[0][6:]] += 1
+
+        # "Label: a, b, Label2: c" -> values belong to the last label seen
+        current = None
+        for part in parts[1:]:
+            label, sep, value = part.partition(": ")
+            if sep and label in INPUT_LABELS:
+                current = INPUT_LABELS[label]
+                self.feature_present[current] += 1
+            else:
+                value = part
+            if current is None or value not in FEATURE_VALUES[current]:
+                self.error("unknown_feature", where, part)
+                ok = False
+                continue
+            self.features[current][value] += 1
+
+        output = record["output"]
+        if "# Data Flow" not in output:
+            self.error("missing_data_flow", where)
+            ok = False
+        hint = hint_of(record)
+        self.hints[hint] += 1
+        if hint not in HINT_CATEGORIES:
+            self.error("missing_hint", where, output.rsplit("\n", 1)[-1])
+            ok = False
+        return ok
+
+    def merge(self, other: "Profile"):
+        self.records += other.records
+        self.valid += other.valid
+        self.errors.update(other.errors)
+        for kind, examples in other.examples.items():
+            mine = self.examples.setdefault(kind, [])
+            mine.extend(examples[:MAX_EXAMPLES - len(mine)])
+        for field in FIELDS:
+            self.lengths[field].update(other.lengths[field])
+            self.tokens[field].update(other.tokens[field])
+        self.totals.update(other.totals)
+        for key, value in other.maxima.items():
+            self.maxima[key] = max(self.maxima[key], value)
+        self.techs.update(other.techs)
+        self.instructions.update(other.instructions)
+        for name in FEATURES:
+            self.features[name].update(other.features[name])
+        self.feature_present.update(other.feature_present)
+        self.hints.update(other.hints)
+
+    def summary(self) -> Dict:
+        records = self.records or 1
+
+        def histogram(counter):
+            return {f"<={edge}": counter[edge] for edge in sorted(counter)}
+
+        return {
+            "records": self.records,
+            "valid": self.valid,
+            "invalid": self.records - self.valid,
+            "error_rate": round((self.records - self.valid) / records, 6),
+            "errors": dict(self.errors.most_common()),
+            "error_examples": self.examples,
+            "fields": {
+                field: {
+                    "mean_chars": round(self.totals[f"{field}.chars"] / records, 1),
+                    "max_chars": self.maxima[f"{field}.chars"],
+                    "mean_tokens": round(self.totals[f"{field}.tokens"] / records, 1),
+                    "max_tokens": self.maxima[f"{field}.tokens"],
+                    "chars_histogram": histogram(self.lengths[field]),
+                    "tokens_histogram": histogram(self.tokens[field]),
+                }
+                for field in FIELDS
+            },
+            "techs": dict(self.techs.most_common()),
+            "instructions": dict(self.instructions.most_common()),
+            "feature_presence": {name: round(self.feature_present[name] / records, 4)
+                                 for name in FEATURES},
+            "features": {name: dict(counter.most_common())
+                         for name, counter in self.features.items()},
+            "hints": dict(self.hints.most_common()),
+        }
+
+# ------------------------------------------------------------------------------
+# Readers (run in worker processes)
+# ------------------------------------------------------------------------------
+
+def iter_range(path: str, start: int, end: int, use_mmap: bool) -> Iterator[Tuple[int, bytes]]:
+    """(offset, line) for lines starting in [start, end) of a plain file."""
+    with open(path, "rb") as f:
+        if use_mmap:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = start
+                if start:
+                    pos = mm.find(b"\n", start - 1) + 1 or size
+                while pos < end:
+                    newline = mm.find(b"\n", pos)
+                    stop = size if newline == -1 else newline + 1
+                    yield pos, mm[pos:stop]
+                    pos = stop
+            return
+
+        pos = start
+        if start:
+            f.seek(start - 1)
+            pos = start - 1 + len(f.readline())
+        else:
+            f.seek(0)
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            yield pos, line
+            pos += len(line)
+
+def profile_range(path: str, start: int, end: int, use_mmap: bool) -> Profile:
+    profile = Profile()
+    name = os.path.basename(path)
+    for offset, line in iter_range(path, start, end, use_mmap):
+        if line.strip():
+            profile.add_line(line, f"{name}@{offset}")
+    return profile
+
+def profile_file(path: str) -> Profile:
+    """Whole compressed JSONL or Parquet file (not splittable)."""
+    profile = Profile()
+    name = os.path.basename(path)
+    for number, line in enumerate(dataset_writers.iter_lines(path), 1):
+        if line.strip():
+            profile.add_line(line, f"{name}:{number}")
+    return profile
+
+# ------------------------------------------------------------------------------
+# Driver
+# ------------------------------------------------------------------------------
+
+def resolve_inputs(inputs: List[str]) -> Tuple[List[str], List[Dict]]:
+    """Expand globs and manifests; returns (paths, manifest shard entries)."""
+    paths, shards = [], []
+    for pattern in inputs:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if path.endswith(".manifest.json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                base = os.path.dirname(path)
+                for shard in manifest["shards"]:
+                    shard = dict(shard, path=os.path.join(base, shard["path"]))
+                    shards.append(shard)
+                    paths.append(shard["path"])
+            else:
+                paths.append(path)
+    return paths, shards
+
+def plan_tasks(paths: List[str], range_bytes: int, use_mmap: bool) -> List[Tuple]:
+    tasks = []
+    for path in paths:
+        if dataset_writers.detect(path) != {"format": "jsonl", "compression": None}:
+            tasks.append((profile_file, path))
+            continue
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), range_bytes):
+            tasks.append((profile_range, path, start, min(size, start + range_bytes), use_mmap))
+    return tasks
+
+def check_manifest(shards: List[Dict], profile_counts: Dict[str, int]) -> List[str]:
+    problems = []
+    for shard in shards:
+        path = shard["path"]
+        if not os.path.exists(path):
+            problems.append(f"{path}: missing")
+            continue
+        if dataset_writers.file_sha256(path) != shard["sha256"]:
+            problems.append(f"{path}: sha256 mismatch")
+        if profile_counts.get(path, 0) != shard["records"]:
+            problems.append(f"{path}: {profile_counts.get(path, 0)} records, "
+                            f"manifest says {shard['records']}")
+    return problems
+
+def validate(inputs: List[str], workers: int = 1, use_mmap: bool = False,
+             range_bytes: int = RANGE_BYTES) -> Dict:
+    paths, shards = resolve_inputs(inputs)
+    missing = [path for path in paths if not os.path.exists(path)]
+    paths = [path for path in paths if os.path.exists(path)]
+    tasks = plan_tasks(paths, range_bytes, use_mmap)
+
+    start = time.perf_counter()
+    total = Profile()
+    per_file = Counter()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(task[1], pool.submit(*task)) for task in tasks]
+            for path, future in futures:
+                profile = future.result()
+                per_file[path] += profile.records
+                total.merge(profile)
+    else:
+        for task in tasks:
+            profile = task[0](*task[1:])
+            per_file[task[1]] += profile.records
+            total.merge(profile)
+    elapsed = time.perf_counter() - start
+
+    summary = total.summary()
+    summary["files"] = len(paths)
+    summary["missing_files"] = missing
+    summary["bytes"] = sum(os.path.getsize(path) for path in paths)
+    summary["seconds"] = round(elapsed, 3)
+    summary["records_per_second"] = round(total.records / elapsed, 1) if elapsed else None
+    if shards:
+        summary["manifest_problems"] = check_manifest(shards, per_file)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Validate and profile a generated dataset.")
+    parser.add_argument("inputs", nargs="+",
+                        help="JSONL/Parquet files, globs or *.manifest.json")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (default 1; 0 = all CPUs)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="memory-map plain JSONL instead of buffered reads")
+    parser.add_argument("--range-mb", type=int, default=RANGE_BYTES // (1024 * 1024),
+                        help="plain JSONL split size per task")
+    parser.add_argument("--summary", help="write the summary JSON here (default: stdout)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="exit 1 when the invalid fraction exceeds this")
+    args = parser.parse_args(argv)
+
+    summary = validate(args.inputs, workers=args.workers or os.cpu_count() or 1,
+                       use_mmap=args.mmap, range_bytes=max(1, args.range_mb) * 1024 * 1024)
+
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = (summary["error_rate"] > args.max_error_rate or summary["missing_files"]
+              or summary.get("manifest_problems"))
+    status = "❌" if failed else "✅"
+    print(f"{status} {summary['valid']}/{summary['records']} valid records "
+          f"in {summary['files']} file(s), {summary['seconds']}s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
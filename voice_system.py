@@ -2,6 +2,8 @@ import subprocess
 import tempfile
 import os
 
+from metrics import metrics
+
 class VoiceSystem:
     def __init__(self, config):
         self.config = config
@@ -35,6 +37,7 @@ class VoiceSystem:
             print(f"Voice listening error: {e}")
             return None
             
+    @metrics.timed("voice.stt")
     def speech_to_text(self, audio_file):
         """Convert speech to text"""
         # Using Termux API for speech recognition
@@ -65,6 +68,7 @@ class VoiceSystem:
         except:
             return "मैंने आपकी आवाज नहीं समझी"
             
+    @metrics.timed("voice.tts")
     def speak(self, text):
         """Speak text using Termux TTS"""
         self.is_speaking = True